@@ -0,0 +1,36 @@
+"""Index on users.updated_at
+
+Revision ID: 0e9d6009a624
+Revises: 8d41f6b2a5e3
+Create Date: 2026-10-18 10:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e9d6009a624'
+down_revision = '8d41f6b2a5e3'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns); create_all already adds them on fresh databases
+INDEXES = [
+    ('ix_users_updated_at', 'users', ['updated_at']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
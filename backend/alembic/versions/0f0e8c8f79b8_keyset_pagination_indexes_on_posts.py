@@ -0,0 +1,37 @@
+"""Keyset pagination indexes on posts
+
+Revision ID: 0f0e8c8f79b8
+Revises: 4f1d2a9c7e30
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f0e8c8f79b8'
+down_revision = '4f1d2a9c7e30'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns); create_all already adds them on fresh databases
+INDEXES = [
+    ('ix_posts_created_at_id', 'posts', ['created_at', 'id']),
+    ('ix_posts_author_created_at_id', 'posts', ['author_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""Primary key on post_hashtags
+
+Revision ID: 3b7e5d1a9c42
+Revises: 9c453821010f
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e5d1a9c42'
+down_revision = '9c453821010f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('post_hashtags'):
+        return
+
+    if not inspector.get_pk_constraint('post_hashtags')['constrained_columns']:
+        # Tags used to be linked without a key, so the same pair could be stored twice
+        op.execute("""
+            CREATE TEMPORARY TABLE distinct_post_hashtags AS
+            SELECT DISTINCT post_id, hashtag_id FROM post_hashtags
+            WHERE post_id IS NOT NULL AND hashtag_id IS NOT NULL
+        """)
+        op.execute("DELETE FROM post_hashtags")
+        op.execute("INSERT INTO post_hashtags (post_id, hashtag_id) SELECT post_id, hashtag_id FROM distinct_post_hashtags")
+        op.execute("DROP TABLE distinct_post_hashtags")
+        with op.batch_alter_table('post_hashtags') as batch_op:
+            batch_op.alter_column('post_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.alter_column('hashtag_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_primary_key('pk_post_hashtags', ['post_id', 'hashtag_id'])
+        if inspector.has_table('hashtags'):
+            op.execute("UPDATE hashtags SET usage_count = (SELECT COUNT(*) FROM post_hashtags WHERE post_hashtags.hashtag_id = hashtags.id)")
+
+    if 'ix_post_hashtags_hashtag_id' not in {index['name'] for index in inspector.get_indexes('post_hashtags')}:
+        op.create_index(op.f('ix_post_hashtags_hashtag_id'), 'post_hashtags', ['hashtag_id'])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('post_hashtags'):
+        return
+    if 'ix_post_hashtags_hashtag_id' in {index['name'] for index in inspector.get_indexes('post_hashtags')}:
+        op.drop_index(op.f('ix_post_hashtags_hashtag_id'), table_name='post_hashtags')
+    if inspector.get_pk_constraint('post_hashtags')['name'] == 'pk_post_hashtags':
+        with op.batch_alter_table('post_hashtags') as batch_op:
+            batch_op.drop_constraint('pk_post_hashtags', type_='primary')
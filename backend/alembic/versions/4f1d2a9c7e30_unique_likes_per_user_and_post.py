@@ -0,0 +1,47 @@
+"""Unique likes per user and post
+
+Revision ID: 4f1d2a9c7e30
+Revises: b21ca7fc29c0
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1d2a9c7e30'
+down_revision = 'b21ca7fc29c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # likes is created by create_all on fresh databases, where the constraint already exists
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('likes'):
+        return
+    unique = any(
+        set(index['column_names']) == {'user_id', 'post_id'} and index['unique'] for index in inspector.get_indexes('likes')
+    ) or any(
+        set(constraint['column_names']) == {'user_id', 'post_id'} for constraint in inspector.get_unique_constraints('likes')
+    )
+
+    if not unique:
+        # Keep the oldest like of each (user, post) pair
+        op.execute("""
+            DELETE FROM likes WHERE id NOT IN (
+                SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM likes GROUP BY user_id, post_id) AS keep
+            )
+        """)
+        op.create_index('uq_likes_user_id_post_id', 'likes', ['user_id', 'post_id'], unique=True)
+
+    # like_post never incremented likes_count before the buffered counters,
+    # while unlike_post decremented it, so every post is recounted
+    op.execute("UPDATE posts SET likes_count = (SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id)")
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if any(index['name'] == 'uq_likes_user_id_post_id' for index in inspector.get_indexes('likes')):
+        op.drop_index('uq_likes_user_id_post_id', table_name='likes')
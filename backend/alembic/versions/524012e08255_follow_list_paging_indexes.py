@@ -0,0 +1,37 @@
+"""Follow list paging indexes
+
+Revision ID: 524012e08255
+Revises: 9819a6d4f1b2
+Create Date: 2026-10-18 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '524012e08255'
+down_revision = '9819a6d4f1b2'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns); create_all already adds them on fresh databases
+INDEXES = [
+    ('ix_follows_following_id_id', 'follows', ['following_id', 'id']),
+    ('ix_follows_follower_id_id', 'follows', ['follower_id', 'id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""user_stats counters
+
+Revision ID: 6a2c8e4f0b17
+Revises: 3b7e5d1a9c42
+Create Date: 2026-10-18 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a2c8e4f0b17'
+down_revision = '3b7e5d1a9c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('user_stats'):
+        op.create_table('user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('posts_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('following_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+        )
+
+    # One row per user that does not have one yet, counted from the source tables
+    posts_count = "(SELECT COUNT(*) FROM posts WHERE posts.author_id = users.id AND posts.is_active = TRUE)"
+    followers_count, following_count = "0", "0"
+    if inspector.has_table('follows'):
+        followers_count = "(SELECT COUNT(*) FROM follows WHERE follows.following_id = users.id)"
+        following_count = "(SELECT COUNT(*) FROM follows WHERE follows.follower_id = users.id)"
+    op.execute(f"""
+        INSERT INTO user_stats (user_id, posts_count, followers_count, following_count)
+        SELECT users.id, {posts_count}, {followers_count}, {following_count} FROM users
+        WHERE NOT EXISTS (SELECT 1 FROM user_stats WHERE user_stats.user_id = users.id)
+    """)
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('user_stats'):
+        op.drop_table('user_stats')
@@ -0,0 +1,69 @@
+"""conversations read model
+
+Revision ID: 8d41f6b2a5e3
+Revises: 6a2c8e4f0b17
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f6b2a5e3'
+down_revision = '6a2c8e4f0b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('messages'):
+        # Nothing to build from; create_tables.py creates both tables on fresh databases
+        return
+    if not inspector.has_table('conversations'):
+        op.create_table('conversations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('partner_id', sa.Integer(), nullable=False),
+        sa.Column('last_message_id', sa.Integer(), nullable=False),
+        sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_sender_id', sa.Integer(), nullable=False),
+        sa.Column('preview', sa.String(), nullable=True),
+        sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ),
+        sa.ForeignKeyConstraint(['last_sender_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['partner_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'partner_id')
+        )
+        op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
+        op.create_index('ix_conversations_user_id_last_message_id', 'conversations', ['user_id', 'last_message_id'], unique=False)
+
+    # Same as ConversationService.rebuild: one row per side of each pair, notes to self left out
+    op.execute("DELETE FROM conversations")
+    op.execute("""
+        INSERT INTO conversations (user_id, partner_id, last_message_id, last_message_at, last_sender_id, preview, unread_count)
+        SELECT latest.user_id, latest.partner_id, latest.last_message_id,
+               messages.created_at, messages.sender_id, SUBSTR(messages.content, 1, 100), latest.unread_count
+        FROM (
+            SELECT user_id, partner_id, MAX(message_id) AS last_message_id, SUM(unread) AS unread_count
+            FROM (
+                SELECT sender_id AS user_id, receiver_id AS partner_id, id AS message_id, 0 AS unread
+                FROM messages WHERE receiver_id != sender_id
+                UNION ALL
+                SELECT receiver_id, sender_id, id, CASE WHEN NOT is_read THEN 1 ELSE 0 END
+                FROM messages WHERE receiver_id != sender_id
+            ) AS sides
+            GROUP BY user_id, partner_id
+        ) AS latest
+        JOIN messages ON messages.id = latest.last_message_id
+    """)
+
+
+def downgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('conversations'):
+        op.drop_index('ix_conversations_user_id_last_message_id', table_name='conversations')
+        op.drop_index(op.f('ix_conversations_id'), table_name='conversations')
+        op.drop_table('conversations')
@@ -0,0 +1,37 @@
+"""Comment and reply paging indexes
+
+Revision ID: 9819a6d4f1b2
+Revises: 0f0e8c8f79b8
+Create Date: 2026-10-18 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9819a6d4f1b2'
+down_revision = '0f0e8c8f79b8'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns); create_all already adds them on fresh databases
+INDEXES = [
+    ('ix_comments_post_created_at_id', 'comments', ['post_id', 'created_at', 'id']),
+    ('ix_comment_replies_comment_created_at_id', 'comment_replies', ['comment_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,36 @@
+"""Chat history index on messages
+
+Revision ID: 9c453821010f
+Revises: 524012e08255
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c453821010f'
+down_revision = '524012e08255'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, columns); create_all already adds them on fresh databases
+INDEXES = [
+    ('ix_messages_sender_id_receiver_id_created_at', 'messages', ['sender_id', 'receiver_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table) and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""Columns and indexes for autocomplete catch-up
+
+Revision ID: c5f1a7e39d20
+Revises: 0e9d6009a624
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5f1a7e39d20'
+down_revision = '0e9d6009a624'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('hashtags'):
+        if 'updated_at' not in {column['name'] for column in inspector.get_columns('hashtags')}:
+            op.add_column('hashtags', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+        if 'ix_hashtags_updated_at' not in {index['name'] for index in inspector.get_indexes('hashtags')}:
+            op.create_index(op.f('ix_hashtags_updated_at'), 'hashtags', ['updated_at'], unique=False)
+    if inspector.has_table('user_stats'):
+        if 'ix_user_stats_updated_at' not in {index['name'] for index in inspector.get_indexes('user_stats')}:
+            op.create_index(op.f('ix_user_stats_updated_at'), 'user_stats', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('user_stats') and 'ix_user_stats_updated_at' in {index['name'] for index in inspector.get_indexes('user_stats')}:
+        op.drop_index(op.f('ix_user_stats_updated_at'), table_name='user_stats')
+    if inspector.has_table('hashtags'):
+        if 'ix_hashtags_updated_at' in {index['name'] for index in inspector.get_indexes('hashtags')}:
+            op.drop_index(op.f('ix_hashtags_updated_at'), table_name='hashtags')
+        if 'updated_at' in {column['name'] for column in inspector.get_columns('hashtags')}:
+            with op.batch_alter_table('hashtags') as batch_op:
+                batch_op.drop_column('updated_at')
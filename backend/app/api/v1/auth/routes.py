@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
+from typing import Optional
 from ....core.database import get_db
 from ....core.security import create_access_token, verify_password, get_password_hash, verify_token
 from ....models.user import User
+from ....models.user_stats import UserStats
+from ....services.user_search import user_index
+from ....services.autocomplete import autocomplete
 from ....schemas.user import UserCreate, UserLogin, UserResponse, Token
 
 router = APIRouter()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 @router.post("/register", response_model=Token)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
@@ -28,8 +33,12 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         hashed_password=hashed_password
     )
     db.add(db_user)
+    db.flush()
+    db.add(UserStats(user_id=db_user.id))
     db.commit()
     db.refresh(db_user)
+    user_index.upsert(db_user.id, db_user.username, db_user.full_name)
+    autocomplete.users.add(db_user.id, db_user.username)
     
     # Create token
     access_token = create_access_token(data={"sub": str(db_user.id)})
@@ -58,6 +67,17 @@ def get_current_user(token: str = Depends(security), db: Session = Depends(get_d
     
     return user
 
+def get_optional_user(token = Depends(optional_security), db: Session = Depends(get_db)) -> Optional[User]:
+    """The signed-in user, or None for anonymous requests and bad tokens"""
+    payload = verify_token(token.credentials) if token else None
+    if not payload:
+        return None
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+    return db.query(User).filter(User.id == user_id).first()
+
 @router.get("/me", response_model=UserResponse)
 def get_current_user_profile(current_user: User = Depends(get_current_user)):
     return UserResponse.from_orm(current_user)
\ No newline at end of file
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List
-from ....core.database import get_db
+from typing import List, Optional
+from ....core.database import get_db, get_async_db
 from ....models.user import User
 from ....models.message import Message
 from ....core.websocket_manager import notification_manager
 # from ....core.rate_limiter import rate_limit
+from ....services.user_loader import UserLoader, get_user_loader
+from ....services.conversation_service import ConversationService, between, HISTORY_PAGE_SIZE
 from ..auth.routes import get_current_user
 from pydantic import BaseModel
 
@@ -32,10 +35,10 @@ class MessageResponse(BaseModel):
 async def send_message(
     message_data: MessageCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if receiver exists
-    receiver = db.query(User).filter(User.id == message_data.receiver_id).first()
+    receiver = await db.scalar(select(User.id).where(User.id == message_data.receiver_id))
     if not receiver:
         raise HTTPException(status_code=404, detail="Receiver not found")
     
@@ -46,8 +49,10 @@ async def send_message(
         is_delivered=True  # Mark as delivered immediately when sent
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    await db.flush()
+    await db.refresh(message)
+    await db.run_sync(lambda session: ConversationService(session).record(message))
+    await db.commit()
     
     # Send real-time notification
     from ..websocket.chat import manager
@@ -74,90 +79,56 @@ async def send_message(
     }
 
 @router.get("/conversations")
-def get_conversations(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    # Get unique conversation partners
-    conversations = db.query(Message).filter(
-        or_(Message.sender_id == current_user.id, Message.receiver_id == current_user.id)
-    ).all()
-    
-    partners = set()
-    for msg in conversations:
-        if msg.sender_id != current_user.id:
-            partners.add(msg.sender_id)
-        if msg.receiver_id != current_user.id:
-            partners.add(msg.receiver_id)
-    
-    # Get partner details with unread counts
-    users = db.query(User).filter(User.id.in_(partners)).all()
-    result = []
-    
-    for user in users:
-        # Count unread messages from this user
-        unread_count = db.query(Message).filter(
-            Message.sender_id == user.id,
-            Message.receiver_id == current_user.id,
-            Message.is_read == False
-        ).count()
-        
-        # Get last message
-        last_message = db.query(Message).filter(
-            or_(
-                and_(Message.sender_id == current_user.id, Message.receiver_id == user.id),
-                and_(Message.sender_id == user.id, Message.receiver_id == current_user.id)
-            )
-        ).order_by(Message.created_at.desc()).first()
-        
-        result.append({
-            "id": user.id,
-            "username": user.username,
-            "full_name": user.full_name,
-            "unread_count": unread_count,
-            "last_message": last_message.content if last_message else None
-        })
+def get_conversations(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    conversations, next_cursor = ConversationService(db).inbox(current_user.id, cursor, limit)
+    partners = users.load_many(conversation.partner_id for conversation in conversations)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    return result
+    return [{
+        "id": conversation.partner_id,
+        "username": partners[conversation.partner_id].username,
+        "full_name": partners[conversation.partner_id].full_name,
+        "profile_photo": partners[conversation.partner_id].profile_photo,
+        "unread_count": conversation.unread_count,
+        "last_message": conversation.preview,
+        "last_message_id": conversation.last_message_id,
+        "last_message_at": conversation.last_message_at.isoformat() if conversation.last_message_at else None,
+        "last_sender_id": conversation.last_sender_id
+    } for conversation in conversations if conversation.partner_id in partners]
 
 @router.get("/chat/{user_id}")
 def get_chat_messages(
     user_id: int,
+    background_tasks: BackgroundTasks,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    messages = db.query(Message).filter(
-        or_(
-            and_(Message.sender_id == current_user.id, Message.receiver_id == user_id),
-            and_(Message.sender_id == user_id, Message.receiver_id == current_user.id)
-        )
-    ).order_by(Message.created_at).all()
-    
-    # Mark messages as delivered and read
-    db.query(Message).filter(
-        Message.sender_id == user_id,
-        Message.receiver_id == current_user.id,
-        Message.is_delivered == False
-    ).update({"is_delivered": True})
-    
-    # Get unread messages before marking as read
-    unread_messages = db.query(Message).filter(
-        Message.sender_id == user_id,
-        Message.receiver_id == current_user.id,
-        Message.is_read == False
-    ).all()
-    
-    # Mark as read
-    db.query(Message).filter(
-        Message.sender_id == user_id,
-        Message.receiver_id == current_user.id,
-        Message.is_read == False
-    ).update({"is_read": True})
-    db.commit()
+    """Whole history oldest first, or with `limit`, `before_id` or `after_id`
+    one page of it, newest first"""
+    if before_id is not None and after_id is not None:
+        raise HTTPException(status_code=400, detail="Pass before_id or after_id, not both")
+    if before_id is not None or after_id is not None or limit is not None:
+        messages = ConversationService(db).history(current_user.id, user_id, before_id, after_id, limit or HISTORY_PAGE_SIZE)
+    else:
+        messages = db.query(Message).filter(between(current_user.id, user_id)).order_by(Message.created_at).all()
     
-    # Send read receipts via WebSocket
-    from ..websocket.chat import manager
-    import asyncio
-    for msg in unread_messages:
-        asyncio.create_task(manager.send_read_receipt(current_user.id, user_id, msg.id))
+    # Everything up to the newest message shown from the partner is now read:
+    # one bounded UPDATE and a single receipt for the whole range
+    received = [msg.id for msg in messages if msg.sender_id == user_id]
+    up_to = ConversationService(db).mark_read_up_to(current_user.id, user_id, max(received)) if received else None
     
+    # Serialized before the commit expires the loaded rows
     result = []
     for msg in messages:
         result.append({
@@ -169,5 +140,10 @@ def get_chat_messages(
             "is_read": msg.is_read,
             "created_at": msg.created_at.isoformat()
         })
+    db.commit()
+    
+    if up_to is not None:
+        from ..websocket.chat import manager
+        background_tasks.add_task(manager.send_read_up_to, current_user.id, user_id, up_to)
     
     return result
\ No newline at end of file
@@ -5,6 +5,7 @@ from ....models.user import User
 from ....models.report import Report, ReportType
 from ....models.comment_reply import CommentReply
 from ....models.post import Comment
+from ....core.versions import invalidate_post
 # from ....core.rate_limiter import rate_limit
 from ..auth.routes import get_current_user
 from pydantic import BaseModel
@@ -88,7 +89,9 @@ def delete_comment(
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
+    post_id = comment.post_id
     db.delete(comment)
     db.commit()
+    invalidate_post(post_id)
     
     return {"message": "Comment deleted"}
\ No newline at end of file
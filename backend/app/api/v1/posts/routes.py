@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
 from ....core.database import get_db
+from ....core.pagination import encode_cursor, decode_cursor
 from ....models.post import Post, Comment
 from ....models.like import Like
 from ....models.user import User
-from ....models.like import Like
+from ....models.follow import Follow
 from ....models.notification import Notification
 from ....core.websocket_manager import notification_manager
-from ....core.redis_client import redis_client
 # from ....core.rate_limiter import rate_limit
 from ....schemas.post import PostCreate, PostResponse, CommentCreate, CommentResponse
+from ....core.versions import read_versions, invalidate_post, invalidate_new_post, invalidate_deleted_post
+from ....core.etag import make_etag, not_modified
+from ....services.post_cache import PostCache
+from ....services.like_counter import LikeCounter
+from ....services.comment_service import CommentService
+from ....services.hashtag_service import HashtagService
+from ....services.search_service import SearchService
+from ....services.user_stats_service import UserStatsService
+from ....services.user_loader import UserLoader, get_user_loader
+from ....services.trending_service import trending_engine
+from ....services.timeline_service import TimelineService
+from ....services.ranking_service import RankingService
 from ..auth.routes import get_current_user
 
 router = APIRouter()
@@ -23,58 +36,115 @@ def create_post(post_data: PostCreate, current_user: User = Depends(get_current_
         author_id=current_user.id
     )
     db.add(db_post)
+    db.flush()
+    hashtags = HashtagService(db)
+    tags = hashtags.on_create(db_post.id, db_post.content)
+    SearchService(db).index_post(db_post.id, db_post.content)
+    UserStatsService(db).bump(current_user.id, posts_count=1)
     db.commit()
     db.refresh(db_post)
+    
+    hashtags.publish()
+    trending_engine.record(tags)
+    invalidate_new_post(current_user.id)
+    TimelineService(db).fan_out(db_post)
+    
     return PostResponse.from_orm(db_post)
 
 @router.get("/", response_model=List[PostResponse])
-def get_posts(skip: int = 0, limit: int = 20, user_id: int = None, db: Session = Depends(get_db)):
-    query = db.query(Post).filter(Post.is_active == True)
-    if user_id:
-        query = query.filter(Post.author_id == user_id)
-    posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
-    
-    # Calculate counts for each post
-    post_data = []
-    for post in posts:
-        likes_count = db.query(Like).filter(Like.post_id == post.id).count()
-        comments_count = db.query(Comment).filter(Comment.post_id == post.id).count()
-        
-        post_dict = {
-            "id": post.id,
-            "content": post.content,
-            "image_url": post.image_url,
-            "author_id": post.author_id,
-            "author": post.author,
-            "likes_count": likes_count,
-            "comments_count": comments_count,
-            "created_at": post.created_at
-        }
-        post_data.append(post_dict)
-    
-    return post_data
+def get_posts(
+    response: Response,
+    skip: int = 0,
+    limit: int = 20,
+    user_id: int = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    posts, next_cursor = PostCache(db, users).feed_page(user_id, cursor, skip, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
 
-@router.get("/{post_id}", response_model=PostResponse)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+@router.get("/timeline", response_model=List[PostResponse])
+def get_timeline(
+    response: Response,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    before = decode_cursor(cursor, size=1)[0] if cursor else None
+    post_ids = TimelineService(db).read(current_user.id, before, limit)
+    if len(post_ids) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(post_ids[-1])
+    
+    return PostCache(db, users).load(post_ids)
+
+@router.get("/ranked", response_model=List[PostResponse])
+def get_ranked_posts(
+    limit: int = 20,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    post_ids = RankingService(db).ranked_post_ids(current_user.id, limit)
+    return PostCache(db, users).load(post_ids)
+
+@router.get("/viewer-state")
+def get_viewer_state(
+    post_ids: List[int] = Query([]),
+    author_ids: List[int] = Query([]),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Like and follow state of the current user for everything on one feed page"""
+    if len(post_ids) > 100 or len(author_ids) > 100:
+        raise HTTPException(status_code=400, detail="At most 100 post ids and 100 author ids")
     
-    # Calculate counts
-    likes_count = db.query(Like).filter(Like.post_id == post.id).count()
-    comments_count = db.query(Comment).filter(Comment.post_id == post.id).count()
+    liked = set()
+    if post_ids:
+        liked = {row[0] for row in db.query(Like.post_id).filter(
+            Like.user_id == current_user.id,
+            Like.post_id.in_(post_ids)
+        ).all()}
+    following = set()
+    if author_ids:
+        following = {row[0] for row in db.query(Follow.following_id).filter(
+            Follow.follower_id == current_user.id,
+            Follow.following_id.in_(author_ids)
+        ).all()}
     
     return {
-        "id": post.id,
-        "content": post.content,
-        "image_url": post.image_url,
-        "author_id": post.author_id,
-        "author": post.author,
-        "likes_count": likes_count,
-        "comments_count": comments_count,
-        "created_at": post.created_at
+        "liked": {post_id: post_id in liked for post_id in post_ids},
+        "following": {author_id: author_id in following for author_id in author_ids}
     }
 
+@router.get("/{post_id}", response_model=PostResponse)
+def get_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    author_id = db.query(Post.author_id).filter(Post.id == post_id, Post.is_active == True).scalar()
+    if author_id is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    
+    # Validate against the cache version counters before hydrating anything
+    versions = read_versions([f"post:{post_id}", f"user:{author_id}"])
+    cached = not_modified(request, response, versions and make_etag("post", post_id, *versions))
+    if cached:
+        return cached
+    
+    posts = PostCache(db, users).load([post_id])
+    if not posts:
+        raise HTTPException(status_code=404, detail="Post not found")
+    
+    return posts[0]
+
 @router.post("/{post_id}/comments", response_model=CommentResponse)
 def create_comment(post_id: int, comment_data: CommentCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     # Check if post exists
@@ -93,13 +163,31 @@ def create_comment(post_id: int, comment_data: CommentCreate, current_user: User
     post.comments_count += 1
     db.commit()
     db.refresh(db_comment)
+    invalidate_post(post_id)
     
     return CommentResponse.from_orm(db_comment)
 
 @router.get("/{post_id}/comments", response_model=List[CommentResponse])
-def get_comments(post_id: int, db: Session = Depends(get_db)):
-    comments = db.query(Comment).filter(Comment.post_id == post_id).order_by(Comment.created_at.desc()).all()
-    return [CommentResponse.from_orm(comment) for comment in comments]
+def get_comments(
+    post_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    replies: int = Query(3, ge=0, le=20),
+    db: Session = Depends(get_db),
+    users: UserLoader = Depends(get_user_loader)
+):
+    comment_service = CommentService(db, users)
+    stamp = comment_service.stamp(post_id)
+    cached = not_modified(request, response, make_etag("comments", post_id, limit, cursor, replies, *stamp))
+    if cached:
+        return cached
+    
+    comments, next_cursor = comment_service.page(post_id, cursor, limit, replies)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return comments
 
 @router.post("/{post_id}/like")
 def like_post(post_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -107,34 +195,35 @@ def like_post(post_id: int, current_user: User = Depends(get_current_user), db:
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    existing_like = db.query(Like).filter(Like.user_id == current_user.id, Like.post_id == post_id).first()
+    like_counter = LikeCounter(db)
+    existing_like = db.query(Like.id).filter(Like.user_id == current_user.id, Like.post_id == post_id).first()
     
     if existing_like:
-        # Unlike
-        db.delete(existing_like)
+        # Unlike; a concurrent unlike may already have removed the row
+        removed = db.query(Like).filter(Like.id == existing_like.id).delete()
         db.commit()
-        # Count actual likes
-        likes_count = db.query(Like).filter(Like.post_id == post_id).count()
+        likes_count = like_counter.add(post, -1) if removed else like_counter.counts([post])[post_id]
         return {"message": "Post unliked", "is_liked": False, "likes_count": likes_count}
     else:
-        # Like
-        like = Like(user_id=current_user.id, post_id=post_id)
-        db.add(like)
-        db.commit()
-        # Count actual likes
-        likes_count = db.query(Like).filter(Like.post_id == post_id).count()
+        # Like; the (user_id, post_id) constraint turns a double submit into a no-op
+        db.add(Like(user_id=current_user.id, post_id=post_id))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return {"message": "Post liked", "is_liked": True, "likes_count": like_counter.counts([post])[post_id]}
+        likes_count = like_counter.add(post, 1)
         return {"message": "Post liked", "is_liked": True, "likes_count": likes_count}
 
 @router.delete("/{post_id}/like")
 def unlike_post(post_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    like = db.query(Like).filter(Like.user_id == current_user.id, Like.post_id == post_id).first()
-    if not like:
+    removed = db.query(Like).filter(Like.user_id == current_user.id, Like.post_id == post_id).delete()
+    if not removed:
         raise HTTPException(status_code=400, detail="Not liked")
+    db.commit()
     
     post = db.query(Post).filter(Post.id == post_id).first()
-    db.delete(like)
-    post.likes_count -= 1
-    db.commit()
+    LikeCounter(db).add(post, -1)
     return {"message": "Post unliked"}
 
 @router.get("/{post_id}/like-status")
@@ -164,12 +253,16 @@ def edit_post(
     post.content = post_data.content
     if hasattr(post_data, 'image_url') and post_data.image_url:
         post.image_url = post_data.image_url
+    hashtags = HashtagService(db)
+    if post.is_active:
+        hashtags.on_edit(post.id, post.content)
+        SearchService(db).index_post(post.id, post.content)
     
     db.commit()
     db.refresh(post)
     
-    # Clear cache
-    redis_client.delete("posts:0:20")
+    hashtags.publish()
+    invalidate_post(post_id)
     
     return PostResponse.from_orm(post)
 
@@ -183,11 +276,18 @@ def delete_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
+    was_active = post.is_active
     post.is_active = False
+    db.flush()
+    if was_active:
+        UserStatsService(db).bump(current_user.id, posts_count=-1)
+    hashtags = HashtagService(db)
+    hashtags.on_delete(post.id)
+    SearchService(db).remove_post(post.id)
     db.commit()
     
-    # Clear cache
-    redis_client.delete("posts:0:20")
+    hashtags.publish()
+    invalidate_deleted_post(post_id, current_user.id)
     
     return {"message": "Post deleted"}
 
@@ -7,6 +7,11 @@ from ....models.user import User
 from ....models.post import Post
 from ....models.hashtag import Hashtag
 # from ....core.rate_limiter import rate_limit
+from ....services.trending_service import trending_engine
+from ....services.search_service import SearchService
+from ....services.user_search import user_index
+from ....services.autocomplete import autocomplete
+from ....services.suggestion_service import SuggestionService
 from pydantic import BaseModel
 from ..auth.routes import get_current_user
 
@@ -18,6 +23,7 @@ class SearchResult(BaseModel):
     title: str
     content: str
     username: Optional[str] = None
+    snippet: Optional[str] = None
 
 @router.get("/")
 def search(
@@ -28,13 +34,18 @@ def search(
     results = []
     
     if not type or type == "users":
-        # Search users
-        users = db.query(User).filter(
-            or_(
-                User.username.ilike(f"%{q}%"),
-                User.full_name.ilike(f"%{q}%")
-            )
-        ).limit(10).all()
+        # Typo-tolerant match on username and full name, most similar first
+        if user_index.ready:
+            ranked = [user_id for user_id, _ in user_index.search(q, 10)]
+            found = {user.id: user for user in db.query(User).filter(User.id.in_(ranked)).all()} if ranked else {}
+            users = [found[user_id] for user_id in ranked if user_id in found]
+        else:
+            users = db.query(User).filter(
+                or_(
+                    User.username.ilike(f"%{q}%"),
+                    User.full_name.ilike(f"%{q}%")
+                )
+            ).limit(10).all()
         
         for user in users:
             results.append({
@@ -46,25 +57,24 @@ def search(
             })
     
     if not type or type == "posts":
-        # Search posts
-        posts = db.query(Post).filter(
-            Post.content.ilike(f"%{q}%")
-        ).order_by(Post.created_at.desc()).limit(10).all()
-        
-        for post in posts:
+        # Ranked by the full-text index (BM25 on SQLite, ts_rank on Postgres)
+        for post, snippet in SearchService(db).search_posts(q, 10):
             results.append({
                 "type": "post",
                 "id": post.id,
                 "title": f"Post by {post.author.username}",
                 "content": post.content[:100] + "..." if len(post.content) > 100 else post.content,
-                "username": post.author.username
+                "username": post.author.username,
+                "snippet": snippet
             })
     
     if not type or type == "hashtags":
-        # Search hashtags
+        # Names are stored lower-cased, so a prefix becomes a range scan on the unique index
+        prefix = q.lstrip("#").lower()
         hashtags = db.query(Hashtag).filter(
-            Hashtag.name.ilike(f"%{q}%")
-        ).limit(10).all()
+            Hashtag.name >= prefix,
+            Hashtag.name < prefix + "\U0010ffff"
+        ).order_by(Hashtag.usage_count.desc()).limit(10).all() if prefix else []
         
         for hashtag in hashtags:
             results.append({
@@ -76,37 +86,48 @@ def search(
     
     return results
 
+@router.get("/autocomplete")
+def get_autocomplete(q: str = Query(..., min_length=1, max_length=100), limit: int = Query(8, ge=1, le=20)):
+    # In-memory prefix index: no database work per keystroke
+    return autocomplete.suggest(q, limit)
+
 @router.get("/trending")
-def get_trending(db: Session = Depends(get_db)):
-    try:
-        # Get top hashtags by usage
-        trending = db.query(Hashtag).order_by(Hashtag.usage_count.desc()).limit(10).all()
-        return [{"name": tag.name, "count": tag.usage_count} for tag in trending]
-    except Exception as e:
-        return []
+def get_trending(window: str = Query("24h", pattern="^(1h|24h)$"), limit: int = Query(10, ge=1, le=50)):
+    # Served from the in-memory sliding-window counters, not the hashtags table
+    return [{"name": name, "count": count} for name, count in trending_engine.top(window, limit)]
 
 @router.get("/suggestions")
 def get_user_suggestions(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     from ....models.follow import Follow
     
-    # Get users that current user is NOT following
-    following_ids = db.query(Follow.following_id).filter(Follow.follower_id == current_user.id).subquery()
+    # Precomputed friends-of-friends, re-checked against follows made since the batch ran
+    suggestions = SuggestionService(db).for_user(current_user.id)
+    candidate_ids = [entry[0] for entry in suggestions]
+    followed = {row[0] for row in db.query(Follow.following_id).filter(
+        Follow.follower_id == current_user.id, Follow.following_id.in_(candidate_ids)
+    ).all()} if candidate_ids else set()
+    suggestions = [entry for entry in suggestions if entry[0] not in followed][:10]
     
-    users = db.query(User).filter(
-        User.id != current_user.id,
-        ~User.id.in_(following_ids)
-    ).order_by(func.random()).limit(10).all()
+    ids = [entry[0] for entry in suggestions]
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(ids)).all()} if ids else {}
+    follower_counts = dict(db.query(Follow.following_id, func.count(Follow.id)).filter(
+        Follow.following_id.in_(ids)
+    ).group_by(Follow.following_id).all()) if ids else {}
     
     result = []
-    for user in users:
-        follower_count = db.query(Follow).filter(Follow.following_id == user.id).count()
+    for user_id, mutual_count, shared_interests in suggestions:
+        user = users.get(user_id)
+        if not user:
+            continue
         
         result.append({
             "id": user.id, 
             "username": user.username, 
             "full_name": user.full_name,
             "is_following": False,
-            "followers_count": follower_count
+            "followers_count": follower_counts.get(user.id, 0),
+            "mutual_count": mutual_count,
+            "shared_interests": shared_interests
         })
     
-    return result
\ No newline at end of file
+    return result
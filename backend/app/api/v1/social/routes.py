@@ -1,13 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
-from ....core.database import get_db
+from sqlalchemy import and_, func, select
+from typing import Optional
+from ....core.database import SessionLocal, get_db, get_async_db
 from ....models.user import User
 from ....models.follow import Follow
 from ....models.notification import Notification
 from ....core.websocket_manager import notification_manager
+from ....core.versions import invalidate_follow
+from ....services.timeline_service import TimelineService
+from ....services.autocomplete import autocomplete
+from ....services.follow_graph import follow_graph
+from ....services.follow_service import FollowService
+from ....services.user_stats_service import UserStatsService
 # from ....core.rate_limiter import rate_limit
-from ..auth.routes import get_current_user
+from ..auth.routes import get_current_user, get_optional_user
 
 router = APIRouter()
 
@@ -15,15 +24,15 @@ router = APIRouter()
 async def follow_user(
     user_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
     
     # Check if already following
-    existing = db.query(Follow).filter(
+    existing = await db.scalar(select(Follow.id).where(
         and_(Follow.follower_id == current_user.id, Follow.following_id == user_id)
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(status_code=400, detail="Already following")
@@ -40,7 +49,25 @@ async def follow_user(
         related_user_id=current_user.id
     )
     db.add(notification)
-    db.commit()
+    await db.flush()
+    
+    def bump_counts(session: Session):
+        stats = UserStatsService(session)
+        stats.bump(current_user.id, following_count=1)
+        stats.bump(user_id, followers_count=1)
+    
+    await db.run_sync(bump_counts)
+    await db.commit()
+    
+    def after_commit():
+        invalidate_follow(current_user.id, user_id)
+        with SessionLocal() as session:
+            TimelineService(session).add_author(current_user.id, user_id)
+        autocomplete.users.adjust(user_id, 1)
+        follow_graph.add(current_user.id, user_id, follow.id)
+    
+    # Blocking Redis calls and in-process index locks stay off the event loop
+    await run_in_threadpool(after_commit)
     
     # Send real-time notification
     await notification_manager.send_notification(user_id, {
@@ -65,46 +92,57 @@ def unfollow_user(
         raise HTTPException(status_code=400, detail="Not following user")
     
     db.delete(follow)
+    db.flush()
+    stats = UserStatsService(db)
+    stats.bump(current_user.id, following_count=-1)
+    stats.bump(user_id, followers_count=-1)
     db.commit()
     
+    invalidate_follow(current_user.id, user_id)
+    TimelineService(db).remove_author(current_user.id, user_id)
+    autocomplete.users.adjust(user_id, -1)
+    follow_graph.remove(current_user.id, user_id)
+    
     return {"message": "Unfollowed user"}
 
 @router.get("/followers/{user_id}")
-def get_followers(user_id: int, db: Session = Depends(get_db)):
-    followers = db.query(Follow).filter(Follow.following_id == user_id).all()
-    result = []
-    for f in followers:
-        follower_count = db.query(Follow).filter(Follow.following_id == f.follower_id).count()
-        result.append({
-            "id": f.follower_id,
-            "username": f.follower.username,
-            "full_name": f.follower.full_name,
-            "followers_count": follower_count,
-            "is_following": False
-        })
+def get_followers(
+    user_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    viewer: Optional[User] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    result, next_cursor = FollowService(db).page(user_id, True, viewer and viewer.id, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return result
 
 @router.get("/following/{user_id}")
-def get_following(user_id: int, db: Session = Depends(get_db)):
-    following = db.query(Follow).filter(Follow.follower_id == user_id).all()
-    result = []
-    for f in following:
-        follower_count = db.query(Follow).filter(Follow.following_id == f.following_id).count()
-        result.append({
-            "id": f.following_id,
-            "username": f.following.username,
-            "full_name": f.following.full_name,
-            "followers_count": follower_count,
-            "is_following": True
-        })
+def get_following(
+    user_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    viewer: Optional[User] = Depends(get_optional_user),
+    db: Session = Depends(get_db)
+):
+    result, next_cursor = FollowService(db).page(user_id, False, viewer and viewer.id, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return result
 
 @router.get("/stats/{user_id}")
 def get_user_stats(user_id: int, db: Session = Depends(get_db)):
-    followers_count = db.query(Follow).filter(Follow.following_id == user_id).count()
-    following_count = db.query(Follow).filter(Follow.follower_id == user_id).count()
+    if follow_graph.ready:
+        return {
+            "followers": follow_graph.followers_count(user_id),
+            "following": follow_graph.following_count(user_id)
+        }
+    stats = UserStatsService(db).get(user_id)
     
     return {
-        "followers": followers_count,
-        "following": following_count
+        "followers": stats["followers_count"],
+        "following": stats["following_count"]
     }
\ No newline at end of file
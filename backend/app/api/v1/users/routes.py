@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from typing import List
 from ....core.database import get_db
 from ....models.user import User
-from ....models.post import Post
-from ....models.follow import Follow
+from ....core.versions import invalidate_user
+from ....core.etag import make_etag, not_modified
+from ....services.user_search import user_index
+from ....services.profile_cache import ProfileCache
+from ....services.user_loader import UserLoader, get_user_loader, MAX_BATCH
 from ..auth.routes import get_current_user
 
 router = APIRouter()
@@ -18,32 +21,25 @@ def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(ge
         "full_name": user.full_name
     } for user in users]
 
+@router.get("/batch")
+def get_users_batch(ids: List[int] = Query([]), loader: UserLoader = Depends(get_user_loader)):
+    """Compact cards for up to 100 users in one query, in the order asked; unknown ids are left out"""
+    if len(ids) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH} user ids")
+    return loader.cards(ids)
+
 @router.get("/{user_id}")
-def get_user_profile(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    print(f"GET user {user_id} - profile_photo from DB: {getattr(user, 'profile_photo', 'MISSING')}")
+def get_user_profile(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    versions = ProfileCache.versions(user_id)
+    cached = not_modified(request, response, versions and make_etag("profile", user_id, *versions))
+    if cached:
+        return cached
     
-    posts_count = db.query(Post).filter(Post.author_id == user_id).count()
-    followers_count = db.query(Follow).filter(Follow.following_id == user_id).count()
-    following_count = db.query(Follow).filter(Follow.follower_id == user_id).count()
-    
-    profile_photo = getattr(user, 'profile_photo', None)
-    print(f"Profile photo value being returned: {profile_photo}")
+    profile = ProfileCache(db).get(user_id, versions)
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    return {
-        "id": user.id,
-        "username": user.username,
-        "full_name": user.full_name,
-        "email": user.email,
-        "bio": getattr(user, 'bio', None),
-        "profile_photo": profile_photo,
-        "posts_count": posts_count,
-        "followers_count": followers_count,
-        "following_count": following_count
-    }
+    return profile
 
 @router.put("/{user_id}")
 def update_user_profile(
@@ -70,17 +66,12 @@ def update_user_profile(
     if 'profile_photo' in profile_data:
         user.profile_photo = profile_data['profile_photo']
         print(f"Updated profile_photo to: {profile_data['profile_photo']}")
-        
-        # Also try direct SQL update as backup
-        db.execute(
-            text("UPDATE users SET profile_photo = :photo WHERE id = :user_id"),
-            {"photo": profile_data['profile_photo'], "user_id": user_id}
-        )
-        print(f"Direct SQL update executed")
     
     try:
         db.commit()
         db.refresh(user)
+        invalidate_user(user_id)
+        user_index.upsert(user.id, user.username, user.full_name)
         print(f"User after commit and refresh - profile_photo: {user.profile_photo}")
         return {"message": "Profile updated successfully"}
     except Exception as e:
@@ -1,12 +1,22 @@
 from fastapi import WebSocket, WebSocketDisconnect, Depends
-from typing import Dict, Set
+from typing import Dict, Optional, Set, Tuple
 import json
+from ....core.backplane import Backplane, backplane
+from ....core.security import verify_token
 from ....models.user import User
+from ....services.conversation_service import mark_read_up_to
 
 class ConnectionManager:
-    def __init__(self):
+    """Chat sockets of this worker. Events go out through the backplane, so they
+    reach the receiver whichever worker holds its socket."""
+
+    channel = "chat"
+
+    def __init__(self, backplane: Backplane = backplane):
         self.active_connections: Dict[int, WebSocket] = {}
         self.online_users: Set[int] = set()
+        self.backplane = backplane
+        backplane.subscribe(self.channel, self.deliver)
 
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
@@ -22,78 +32,100 @@ class ConnectionManager:
         if user_id in self.online_users:
             self.online_users.remove(user_id)
 
+    async def publish(self, event: dict, to: Optional[int] = None, skip: Optional[int] = None):
+        """Send `event` to user `to`, or to everyone connected except `skip`"""
+        await self.backplane.publish(self.channel, {"to": to, "skip": skip, "text": json.dumps(event)})
+
+    async def deliver(self, event: dict):
+        """Backplane handler: write an event to the matching sockets held here"""
+        if event["to"] is not None:
+            targets = [event["to"]]
+        else:
+            targets = [user_id for user_id in self.active_connections if user_id != event["skip"]]
+        for user_id in targets:
+            websocket = self.active_connections.get(user_id)
+            if websocket is None:
+                continue
+            try:
+                await websocket.send_text(event["text"])
+            except:
+                pass
+
     async def send_personal_message(self, message: str, user_id: int):
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
-            await websocket.send_text(message)
+        await self.backplane.publish(self.channel, {"to": user_id, "skip": None, "text": message})
 
     async def broadcast_user_status(self, user_id: int, status: str):
-        message = json.dumps({
+        await self.publish({
             "type": status,
             "data": {"user_id": user_id}
-        })
-        
-        for connection_user_id, websocket in self.active_connections.items():
-            if connection_user_id != user_id:
-                try:
-                    await websocket.send_text(message)
-                except:
-                    pass
+        }, skip=user_id)
 
     async def send_message_notification(self, sender_id: int, receiver_id: int, message_data: dict):
-        message = json.dumps({
+        await self.publish({
             "type": "new_message",
             "data": message_data
-        })
-        
-        # Send to receiver
-        if receiver_id in self.active_connections:
-            try:
-                await self.active_connections[receiver_id].send_text(message)
-            except:
-                pass
+        }, to=receiver_id)
 
     async def send_typing_status(self, sender_id: int, receiver_id: int, is_typing: bool):
-        message = json.dumps({
+        await self.publish({
             "type": "typing_start" if is_typing else "typing_stop",
             "data": {"user_id": sender_id}
-        })
-        
-        if receiver_id in self.active_connections:
-            try:
-                await self.active_connections[receiver_id].send_text(message)
-            except:
-                pass
+        }, to=receiver_id)
 
-    async def send_read_receipt(self, reader_id: int, sender_id: int, message_id: int):
-        message = json.dumps({
-            "type": "message_read",
+    async def send_read_up_to(self, reader_id: int, sender_id: int, up_to_id: int):
+        """One receipt covering every message from sender_id to reader_id with id <= up_to_id"""
+        await self.publish({
+            "type": "messages_read_up_to",
             "data": {
-                "message_id": message_id,
+                "up_to_id": up_to_id,
                 "reader_id": reader_id
             }
-        })
-        
-        if sender_id in self.active_connections:
-            try:
-                await self.active_connections[sender_id].send_text(message)
-            except:
-                pass
+        }, to=sender_id)
 
 manager = ConnectionManager()
 
+# The user ids each client frame carries
+FRAME_FIELDS = {
+    "typing_start": ("receiver_id",),
+    "typing_stop": ("receiver_id",),
+    "messages_read_up_to": ("sender_id", "up_to_id")
+}
+
+def read_frame(data: str) -> Optional[Tuple[str, Dict[str, int]]]:
+    """(type, fields) of a client frame with its ids as ints, or None when it is malformed"""
+    try:
+        message = json.loads(data)
+        fields = FRAME_FIELDS[message["type"]]
+        return message["type"], {name: int(message["data"][name]) for name in fields}
+    except (ValueError, KeyError, TypeError):
+        return None
+
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
+    # The socket writes read receipts, so it must belong to the token's user
+    payload = verify_token(websocket.query_params.get("token", ""))
+    if not payload or payload.get("sub") != str(user_id):
+        await websocket.close(code=4001)
+        return
+
     await manager.connect(websocket, user_id)
     try:
         while True:
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            frame = read_frame(await websocket.receive_text())
+            if frame is None:
+                continue
+            kind, fields = frame
             
-            if message["type"] == "typing_start":
-                await manager.send_typing_status(user_id, message["data"]["receiver_id"], True)
-            elif message["type"] == "typing_stop":
-                await manager.send_typing_status(user_id, message["data"]["receiver_id"], False)
+            if kind == "typing_start":
+                await manager.send_typing_status(user_id, fields["receiver_id"], True)
+            elif kind == "typing_stop":
+                await manager.send_typing_status(user_id, fields["receiver_id"], False)
+            elif kind == "messages_read_up_to":
+                up_to = await mark_read_up_to(user_id, fields["sender_id"], fields["up_to_id"])
+                if up_to is not None:
+                    await manager.send_read_up_to(user_id, fields["sender_id"], up_to)
                 
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(user_id)
         await manager.broadcast_user_status(user_id, "user_offline")
\ No newline at end of file
@@ -1,14 +1,19 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
 from ....core.security import verify_token
 from ....core.websocket_manager import notification_manager
+from ....core.backplane import Backplane, backplane
 
 router = APIRouter()
 
 class ConnectionManager:
-    def __init__(self):
+    channel = "direct"
+
+    def __init__(self, backplane: Backplane = backplane):
         self.active_connections: Dict[int, WebSocket] = {}
+        self.backplane = backplane
+        backplane.subscribe(self.channel, self.deliver)
 
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
@@ -18,25 +23,44 @@ class ConnectionManager:
         if user_id in self.active_connections:
             del self.active_connections[user_id]
 
+    async def deliver(self, event: dict):
+        """Backplane handler: write a message to the sockets held by this worker"""
+        targets = [event["to"]] if event["to"] is not None else list(self.active_connections)
+        for user_id in targets:
+            websocket = self.active_connections.get(user_id)
+            if websocket is None:
+                continue
+            try:
+                await websocket.send_text(event["text"])
+            except:
+                pass
+
     async def send_personal_message(self, message: str, user_id: int):
-        if user_id in self.active_connections:
-            await self.active_connections[user_id].send_text(message)
+        await self.backplane.publish(self.channel, {"to": user_id, "text": message})
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections.values():
-            await connection.send_text(message)
+        await self.backplane.publish(self.channel, {"to": None, "text": message})
 
 manager = ConnectionManager()
 
+def _token_user_id(token: str) -> Optional[int]:
+    """User id from a signed token, or None if it is invalid or has no numeric sub"""
+    payload = verify_token(token)
+    if not payload:
+        return None
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
 @router.websocket("/ws/{token}")
 async def websocket_endpoint(websocket: WebSocket, token: str):
     # Verify token
-    payload = verify_token(token)
-    if not payload:
+    user_id = _token_user_id(token)
+    if user_id is None:
         await websocket.close(code=4001)
         return
     
-    user_id = int(payload.get("sub"))
     await manager.connect(websocket, user_id)
     
     try:
@@ -66,12 +90,11 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
 
 @router.websocket("/notifications/{token}")
 async def notification_websocket(websocket: WebSocket, token: str):
-    payload = verify_token(token)
-    if not payload:
+    user_id = _token_user_id(token)
+    if user_id is None:
         await websocket.close(code=4001)
         return
     
-    user_id = int(payload.get("sub"))
     await notification_manager.connect(websocket, user_id)
     
     try:
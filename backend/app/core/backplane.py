@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Optional
+import redis.asyncio
+from .config import settings
+
+CHANNEL_PREFIX = "ws:"
+
+class Backplane:
+    """Routes WebSocket events to whichever worker holds the receiving socket.
+
+    Managers register a handler per channel and publish events instead of
+    writing to their own sockets; every worker is subscribed, and each
+    handler delivers to the connections its process owns. Until start()
+    succeeds (no Redis, scripts, tests) events are delivered in-process, as
+    they were with a single worker.
+
+    `broker` is anything with Redis' asyncio publish() and pubsub().
+    """
+
+    def __init__(self, broker=None):
+        self.broker = broker
+        self.handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str, handler: Callable[[dict], Awaitable[None]]):
+        self.handlers[channel] = handler
+
+    async def publish(self, channel: str, event: dict):
+        if self.task is not None:
+            try:
+                await self.broker.publish(CHANNEL_PREFIX + channel, json.dumps(event))
+                return
+            except Exception as e:
+                print(f"Backplane publish failed, delivering locally: {e}")
+        await self.handlers[channel](event)
+
+    async def start(self):
+        if self.broker is None:
+            self.broker = redis.asyncio.Redis(
+                host=getattr(settings, 'REDIS_HOST', 'localhost'),
+                port=getattr(settings, 'REDIS_PORT', 6379),
+                db=getattr(settings, 'REDIS_DB', 0),
+                decode_responses=True
+            )
+        pubsub = self.broker.pubsub()
+        await pubsub.subscribe(*(CHANNEL_PREFIX + channel for channel in self.handlers))
+        self.task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def _listen(self, pubsub):
+        try:
+            while True:
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        handler = self.handlers.get(message["channel"][len(CHANNEL_PREFIX):])
+                        try:
+                            if handler:
+                                await handler(json.loads(message["data"]))
+                        except Exception as e:
+                            print(f"Backplane delivery failed: {e}")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Lost the connection: resubscribe once Redis is back
+                    print(f"Backplane listener failed: {e}")
+                    await asyncio.sleep(1)
+                    try:
+                        await pubsub.subscribe(*(CHANNEL_PREFIX + channel for channel in self.handlers))
+                    except Exception:
+                        pass
+        finally:
+            await pubsub.aclose()
+
+backplane = Backplane()
@@ -8,10 +8,36 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./socialdb.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # derived from DATABASE_URL for SQLite and PostgreSQL
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Home timeline
+    TIMELINE_MAX_LENGTH: int = 800  # post ids kept per follower
+    TIMELINE_FANOUT_LIMIT: int = 5000  # authors above this many followers are merged in on read
+    
+    # Ranked feed
+    FEED_RANK_CANDIDATES: int = 500  # most recent posts scored per request
+    FEED_RANK_WEIGHTS: dict = {}  # overrides for RankingWeights, e.g. {"media": 0.0}
+    
+    # Like counters
+    LIKE_FLUSH_INTERVAL_SECONDS: int = 5  # how often buffered Redis deltas are written to posts.likes_count
+    LIKE_RECONCILE_SECONDS: int = 3600  # how often posts.likes_count is checked against the likes table
+    
+    # User stats
+    STATS_RECONCILE_SECONDS: int = 3600  # how often user_stats is checked against the source tables
+    
+    # Follow graph
+    FOLLOW_GRAPH_SNAPSHOT: str = "follow_graph.npz"  # written periodically and on shutdown, read at startup
+    FOLLOW_GRAPH_SNAPSHOT_SECONDS: int = 300
+    FOLLOW_GRAPH_REFRESH_SECONDS: int = 60  # how long other workers' follows take to show up in suggestions
+    
+    # Search
+    AUTOCOMPLETE_REFRESH_SECONDS: int = 60  # how often each worker's typeahead picks up other workers' changes
+    USER_SEARCH_REFRESH_SECONDS: int = 60  # how often each worker's fuzzy user index picks up other workers' changes
+    SUGGESTIONS_REFRESH_SECONDS: int = 3600  # how often the who-to-follow batch job runs
+    
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
@@ -0,0 +1,14 @@
+import os
+import socket
+from .redis_client import redis_client
+
+def claim_run(name: str, interval: int) -> bool:
+    """Whether this worker should run periodic job `name` now.
+
+    Every worker schedules the same jobs; the first to ask in each round takes
+    a Redis key that expires shortly before the next one, so the job runs once
+    per interval across all workers. Without Redis each worker runs its own
+    jobs, as a single process would.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    return redis_client.set_nx(f"jobs:{name}", owner, max(interval * 9 // 10, 1)) is not False
@@ -0,0 +1,37 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import String, and_, or_, type_coerce
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row into an opaque, URL-safe cursor"""
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int = 2) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
+
+def sort_key(column):
+    # Compare timestamps in their stored form. SQLite keeps DATETIME as text and
+    # server defaults are written without microseconds, so binding a Python
+    # datetime would never compare equal to the row it came from. type_coerce
+    # emits no CAST, so the composite index is still used.
+    return type_coerce(column, String)
+
+def keyset_filter(column, id_column, cursor: Optional[str], descending: bool = True):
+    """Rows strictly after the cursor in (column, id) order, or None for the first page"""
+    if not cursor:
+        return None
+    value, last_id = decode_cursor(cursor)
+    key = sort_key(column)
+    if descending:
+        return or_(key < value, and_(key == value, id_column < last_id))
+    return or_(key > value, and_(key == value, id_column > last_id))
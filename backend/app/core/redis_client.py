@@ -1,6 +1,6 @@
 import redis
 import json
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Iterable, List
 from .config import settings
 
 class RedisClient:
@@ -33,10 +33,149 @@ class RedisClient:
         except:
             return False
 
+    def set_nx(self, key: str, value: str, expire: int) -> Optional[bool]:
+        """SET NX EX: True if the key was set, False if it already existed, None if Redis is unavailable"""
+        try:
+            return bool(self.redis.set(key, value, nx=True, ex=expire))
+        except:
+            return None
+
     def exists(self, key: str) -> bool:
         try:
             return self.redis.exists(key) > 0
         except:
             return False
 
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        try:
+            if not keys:
+                return []
+            return [json.loads(value) if value else None for value in self.redis.mget(keys)]
+        except:
+            return [None] * len(keys)
+
+    def set_many(self, mapping: Dict[str, Any], expire: int = 300):
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.setex(key, expire, json.dumps(value, default=str))
+            pipe.execute()
+            return True
+        except:
+            return False
+
+    # Hashes
+    def hmget(self, key: str, fields: List[str]) -> Optional[List[Optional[str]]]:
+        """Field values in order; None if Redis is unavailable"""
+        try:
+            if not fields:
+                return []
+            return self.redis.hmget(key, fields)
+        except:
+            return None
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> Optional[int]:
+        """New value of the field; None if Redis is unavailable"""
+        try:
+            return self.redis.hincrby(key, field, amount)
+        except:
+            return None
+
+    def hgetall(self, key: str) -> Optional[Dict[str, str]]:
+        try:
+            return self.redis.hgetall(key)
+        except:
+            return None
+
+    def hpop_all(self, key: str) -> Optional[Dict[str, str]]:
+        """Read and delete a whole hash atomically"""
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hgetall(key)
+            pipe.delete(key)
+            values, _ = pipe.execute()
+            return values
+        except:
+            return None
+
+    def hsetnx(self, key: str, field: str, value: str):
+        try:
+            self.redis.hsetnx(key, field, value)
+            return True
+        except:
+            return False
+
+    def hincrby_many(self, key: str, fields: Iterable[str], amount: int = 1):
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for field in fields:
+                pipe.hincrby(key, field, amount)
+            pipe.execute()
+            return True
+        except:
+            return False
+
+    def existing(self, keys: List[str]) -> List[str]:
+        """The subset of keys that currently exist, checked in one round trip"""
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.exists(key)
+            return [key for key, found in zip(keys, pipe.execute()) if found]
+        except:
+            return []
+
+    # Sorted sets
+    def zadd_many(self, keys: Iterable[str], mapping: Dict[str, float], max_len: Optional[int] = None, expire: Optional[int] = None):
+        """Add the same members to many sorted sets in one round trip, trimming each to the highest max_len scores"""
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.zadd(key, mapping)
+                if max_len:
+                    pipe.zremrangebyrank(key, 0, -max_len - 1)
+                if expire:
+                    pipe.expire(key, expire)
+            pipe.execute()
+            return True
+        except:
+            return False
+
+    def zrevrange_below(self, key: str, below: Optional[float], count: int) -> Optional[List[str]]:
+        """Members with score strictly below `below` (or all), highest first; None if Redis is unavailable"""
+        try:
+            upper = f"({below}" if below is not None else "+inf"
+            return self.redis.zrevrangebyscore(key, upper, "-inf", start=0, num=count)
+        except:
+            return None
+
+    def zrem(self, key: str, *members: str):
+        try:
+            if members:
+                self.redis.zrem(key, *members)
+            return True
+        except:
+            return False
+
+    # Sets
+    def sadd(self, key: str, *members: str):
+        try:
+            self.redis.sadd(key, *members)
+            return True
+        except:
+            return False
+
+    def srem(self, key: str, *members: str):
+        try:
+            self.redis.srem(key, *members)
+            return True
+        except:
+            return False
+
+    def smembers(self, key: str) -> Optional[set]:
+        try:
+            return self.redis.smembers(key)
+        except:
+            return None
+
 redis_client = RedisClient()
\ No newline at end of file
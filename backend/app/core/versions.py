@@ -0,0 +1,44 @@
+import uuid
+from typing import List, Optional
+from .redis_client import redis_client
+
+# Version counters for cached read models, kept in one Redis hash. Cache keys
+# and ETags embed the versions they were derived from, so bumping a counter
+# orphans every stale entry without scanning keys. The epoch changes if Redis
+# loses the hash, so restarted counters never reproduce an old key or ETag.
+VERSIONS_KEY = "cache:versions"
+
+def bump_versions(*fields: str):
+    redis_client.hincrby_many(VERSIONS_KEY, fields)
+
+def read_versions(fields: List[str]) -> Optional[List[str]]:
+    """Current value of each counter, prefixed by the epoch; None if Redis is unavailable"""
+    values = redis_client.hmget(VERSIONS_KEY, ["epoch"] + fields)
+    if values is None:
+        return None
+    if values[0] is None:
+        redis_client.hsetnx(VERSIONS_KEY, "epoch", uuid.uuid4().hex[:8])
+        values = redis_client.hmget(VERSIONS_KEY, ["epoch"] + fields)
+        if values is None or values[0] is None:
+            return None
+    return [values[0]] + [value or "0" for value in values[1:]]
+
+def invalidate_post(post_id: int):
+    """Content or counts of one post changed (edit, like, comment)"""
+    bump_versions(f"post:{post_id}")
+
+def invalidate_new_post(author_id: int):
+    """A post was created: first pages of the global and author feeds change"""
+    bump_versions("feed:new", f"author_feed:{author_id}")
+
+def invalidate_deleted_post(post_id: int, author_id: int):
+    """A post left the feeds, so every page after it shifts"""
+    bump_versions(f"post:{post_id}", "feed", "feed:new", f"author_feed:{author_id}")
+
+def invalidate_user(user_id: int):
+    """Profile fields changed"""
+    bump_versions(f"user:{user_id}")
+
+def invalidate_follow(follower_id: int, following_id: int):
+    """Follower and following counts changed for both users"""
+    bump_versions(f"follows:{follower_id}", f"follows:{following_id}")
@@ -1,10 +1,15 @@
 from typing import Dict, List
 from fastapi import WebSocket
 import json
+from .backplane import Backplane, backplane
 
 class NotificationManager:
-    def __init__(self):
+    channel = "notifications"
+
+    def __init__(self, backplane: Backplane = backplane):
         self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.backplane = backplane
+        backplane.subscribe(self.channel, self.deliver)
 
     async def connect(self, websocket: WebSocket, user_id: int):
         await websocket.accept()
@@ -13,18 +18,22 @@ class NotificationManager:
         self.active_connections[user_id].append(websocket)
 
     def disconnect(self, websocket: WebSocket, user_id: int):
-        if user_id in self.active_connections:
+        if websocket in self.active_connections.get(user_id, []):
             self.active_connections[user_id].remove(websocket)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
 
     async def send_notification(self, user_id: int, notification: dict):
-        if user_id in self.active_connections:
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_text(json.dumps(notification))
-                except:
-                    # Remove dead connections
-                    self.active_connections[user_id].remove(connection)
+        await self.backplane.publish(self.channel, {"to": user_id, "text": json.dumps(notification)})
+
+    async def deliver(self, event: dict):
+        """Backplane handler: write a notification to the user's sockets on this worker"""
+        user_id = event["to"]
+        for connection in list(self.active_connections.get(user_id, [])):
+            try:
+                await connection.send_text(event["text"])
+            except:
+                # Remove dead connections
+                self.disconnect(connection, user_id)
 
 notification_manager = NotificationManager()
\ No newline at end of file
@@ -1,7 +1,18 @@
+import asyncio
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .core.config import settings
+from .core.database import SessionLocal, engine
+from .core.backplane import backplane
+from .services.like_counter import run_like_flush_loop, run_like_reconcile_loop
+from .services.trending_service import trending_engine
+from .services.search_service import ensure_search_index
+from .services.user_search import user_index, run_user_index_refresh_loop
+from .services.autocomplete import autocomplete, run_autocomplete_refresh_loop
+from .services.suggestion_service import run_suggestions_loop
+from .services.follow_graph import follow_graph, start_follow_graph, run_follow_graph_refresh_loop, run_follow_graph_snapshot_loop
+from .services.user_stats_service import run_stats_reconcile_loop
 from .core.rate_limiter import limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi import _rate_limit_exceeded_handler
@@ -54,6 +65,58 @@ app.include_router(social_router, prefix=f"{settings.API_V1_STR}/social", tags=[
 app.include_router(moderation_router, prefix=f"{settings.API_V1_STR}/moderation", tags=["moderation"])
 app.include_router(ai_router, prefix=f"{settings.API_V1_STR}/ai", tags=["ai"])
 
+# Background jobs
+@app.on_event("startup")
+async def start_background_jobs():
+    asyncio.create_task(run_like_flush_loop(settings.LIKE_FLUSH_INTERVAL_SECONDS))
+    asyncio.create_task(run_like_reconcile_loop(settings.LIKE_RECONCILE_SECONDS))
+    asyncio.create_task(run_autocomplete_refresh_loop(settings.AUTOCOMPLETE_REFRESH_SECONDS))
+    asyncio.create_task(run_user_index_refresh_loop(settings.USER_SEARCH_REFRESH_SECONDS))
+    asyncio.create_task(run_follow_graph_refresh_loop(settings.FOLLOW_GRAPH_REFRESH_SECONDS))
+    asyncio.create_task(run_follow_graph_snapshot_loop(settings.FOLLOW_GRAPH_SNAPSHOT_SECONDS))
+    asyncio.create_task(run_stats_reconcile_loop(settings.STATS_RECONCILE_SECONDS))
+    
+    try:
+        await backplane.start()
+    except Exception as e:
+        print(f"WebSocket backplane unavailable, delivering in-process only: {e}")
+    try:
+        ensure_search_index(engine)
+    except Exception as e:
+        print(f"Search index setup failed: {e}")
+    
+    db = SessionLocal()
+    try:
+        start_follow_graph(db)
+    except Exception as e:
+        print(f"Follow graph load failed: {e}")
+    try:
+        trending_engine.warm(db)
+    except Exception as e:
+        print(f"Trending warm-up failed: {e}")
+    try:
+        user_index.load(db)
+    except Exception as e:
+        print(f"User search index build failed: {e}")
+    try:
+        autocomplete.load(db)
+    except Exception as e:
+        print(f"Autocomplete build failed: {e}")
+    finally:
+        db.close()
+    
+    # Suggestions read the follow graph, so the batch starts once it is loaded
+    asyncio.create_task(run_suggestions_loop(settings.SUGGESTIONS_REFRESH_SECONDS))
+
+@app.on_event("shutdown")
+def save_follow_graph():
+    if follow_graph.ready:
+        follow_graph.save(settings.FOLLOW_GRAPH_SNAPSHOT)
+
+@app.on_event("shutdown")
+async def stop_backplane():
+    await backplane.stop()
+
 # Mount uploads directory
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from ..core.database import Base
 
 class CommentReply(Base):
@@ -9,4 +10,10 @@ class CommentReply(Base):
     comment_id = Column(Integer, ForeignKey("comments.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    author = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_comment_replies_comment_created_at_id", "comment_id", "created_at", "id"),
+    )
\ No newline at end of file
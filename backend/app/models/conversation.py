@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, UniqueConstraint
+from ..core.database import Base
+
+class Conversation(Base):
+    """Inbox read model: one row per participant of each pair of users who have
+    exchanged messages, kept in step by send_message and the read path"""
+    __tablename__ = "conversations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    partner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    last_message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    last_message_at = Column(DateTime(timezone=True))
+    last_sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    preview = Column(String)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")  # messages from partner_id that user_id has not read
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "partner_id"),
+        Index("ix_conversations_user_id_last_message_id", "user_id", "last_message_id"),
+    )
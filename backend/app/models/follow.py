@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from ..core.database import Base
 
@@ -10,4 +10,8 @@ class Follow(Base):
     following_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    __table_args__ = (UniqueConstraint('follower_id', 'following_id'),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint('follower_id', 'following_id'),
+        Index("ix_follows_following_id_id", "following_id", "id"),
+        Index("ix_follows_follower_id_id", "follower_id", "id"),
+    )
\ No newline at end of file
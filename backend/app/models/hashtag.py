@@ -6,8 +6,8 @@ from ..core.database import Base
 post_hashtags = Table(
     'post_hashtags',
     Base.metadata,
-    Column('post_id', Integer, ForeignKey('posts.id')),
-    Column('hashtag_id', Integer, ForeignKey('hashtags.id'))
+    Column('post_id', Integer, ForeignKey('posts.id'), primary_key=True),
+    Column('hashtag_id', Integer, ForeignKey('hashtags.id'), primary_key=True, index=True)
 )
 
 class Hashtag(Base):
@@ -16,4 +16,5 @@ class Hashtag(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, index=True)
     usage_count = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), index=True)  # for autocomplete catch-up
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 
@@ -11,4 +11,9 @@ class Message(Base):
     content = Column(Text, nullable=False)
     is_delivered = Column(Boolean, default=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Chat history pages and the read path range over one direction of a pair at a time
+        Index("ix_messages_sender_id_receiver_id_created_at", "sender_id", "receiver_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -18,6 +18,12 @@ class Post(Base):
     
     author = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post")
+    
+    # Keyset pagination order for the global and per-author feeds
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_author_created_at_id", "author_id", "created_at", "id"),
+    )
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -29,4 +35,8 @@ class Comment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     post = relationship("Post", back_populates="comments")
-    author = relationship("User")
\ No newline at end of file
+    author = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_comments_post_created_at_id", "post_id", "created_at", "id"),
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from .user import UserResponse
 
@@ -31,12 +31,25 @@ class CommentBase(BaseModel):
 class CommentCreate(CommentBase):
     post_id: int
 
+class CommentReplyResponse(BaseModel):
+    id: int
+    comment_id: int
+    content: str
+    author_id: int
+    author: UserResponse
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
 class CommentResponse(CommentBase):
     id: int
     post_id: int
     author_id: int
     author: UserResponse
     created_at: datetime
+    replies_count: int = 0
+    replies: List[CommentReplyResponse] = []
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,5 +1,6 @@
 import openai
 import requests
+from fastapi.concurrency import run_in_threadpool
 import json
 from typing import Dict, Any, Optional
 import os
@@ -18,7 +19,8 @@ class AIServices:
             return {"success": False, "error": "bruv this aint available we will have a look at it and notify you when its working"}
         try:
             openai.api_key = self.openai_api_key
-            response = openai.ChatCompletion.create(
+            response = await run_in_threadpool(
+                openai.ChatCompletion.create,
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=max_tokens
@@ -37,7 +39,7 @@ class AIServices:
                 'requestedAttributes': {'TOXICITY': {}},
                 'comment': {'text': text}
             }
-            response = requests.post(url, json=data)
+            response = await run_in_threadpool(requests.post, url, json=data)
             result = response.json()
             toxicity_score = result['attributeScores']['TOXICITY']['summaryScore']['value']
             return {"success": True, "toxicity_score": toxicity_score, "is_toxic": toxicity_score > 0.7}
@@ -50,7 +52,7 @@ class AIServices:
             return {"success": False, "error": "bruv this aint available we will have a look at it and notify you when its working"}
         try:
             openai.api_key = self.openai_api_key
-            transcript = openai.Audio.transcribe("whisper-1", audio_file)
+            transcript = await run_in_threadpool(openai.Audio.transcribe, "whisper-1", audio_file)
             return {"success": True, "text": transcript.text}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -79,7 +81,7 @@ class AIServices:
                 "style_preset": style
             }
             
-            response = requests.post(url, headers=headers, json=data)
+            response = await run_in_threadpool(requests.post, url, headers=headers, json=data)
             
             if response.status_code == 200:
                 data = response.json()
@@ -105,7 +107,7 @@ class AIServices:
         try:
             url = "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment-latest"
             headers = {"Authorization": f"Bearer {settings.HUGGINGFACE_TOKEN}"}
-            response = requests.post(url, headers=headers, json={"inputs": text})
+            response = await run_in_threadpool(requests.post, url, headers=headers, json={"inputs": text})
             result = response.json()
             return {"success": True, "sentiment": result[0]}
         except Exception as e:
@@ -122,7 +124,7 @@ class AIServices:
                 "Content-Type": "application/json"
             }
             data = {"text": text, "min_length": 50, "max_length": 300}
-            response = requests.post(url, headers=headers, json=data)
+            response = await run_in_threadpool(requests.post, url, headers=headers, json=data)
             result = response.json()
             return {"success": True, "summary": result.get("summary")}
         except Exception as e:
@@ -138,7 +140,7 @@ class AIServices:
                 "X-RapidAPI-Key": settings.RAPIDAPI_KEY,
                 "Content-Type": "application/json"
             }
-            response = requests.post(url, headers=headers, json={"text": text})
+            response = await run_in_threadpool(requests.post, url, headers=headers, json={"text": text})
             result = response.json()
             return {"success": True, "keywords": result.get("keywords", [])}
         except Exception as e:
@@ -149,7 +151,7 @@ class AIServices:
         try:
             url = "https://api.languagetool.org/v2/check"
             data = {"text": text, "language": "en-US"}
-            response = requests.post(url, data=data)
+            response = await run_in_threadpool(requests.post, url, data=data)
             result = response.json()
             return {"success": True, "matches": result.get("matches", [])}
         except Exception as e:
@@ -160,7 +162,7 @@ class AIServices:
         try:
             url = "https://api.qrserver.com/v1/create-qr-code/"
             params = {"size": "200x200", "data": text}
-            response = requests.get(url, params=params)
+            response = await run_in_threadpool(requests.get, url, params=params)
             if response.status_code == 200:
                 return {"success": True, "qr_code": response.content}
             return {"success": False, "error": "QR code generation failed"}
@@ -173,7 +175,7 @@ class AIServices:
             return {"success": False, "error": "bruv this aint available we will have a look at it and notify you when its working"}
         try:
             url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={self.weather_api_key}&units=metric"
-            response = requests.get(url)
+            response = await run_in_threadpool(requests.get, url)
             result = response.json()
             return {"success": True, "weather": result}
         except Exception as e:
@@ -187,7 +189,7 @@ class AIServices:
             url = "https://api-ssl.bitly.com/v4/shorten"
             headers = {"Authorization": f"Bearer {self.bitly_token}"}
             data = {"long_url": long_url}
-            response = requests.post(url, headers=headers, json=data)
+            response = await run_in_threadpool(requests.post, url, headers=headers, json=data)
             result = response.json()
             return {"success": True, "short_url": result.get("link")}
         except Exception as e:
@@ -202,7 +204,7 @@ class AIServices:
             suffix = sha1_hash[5:]
             
             url = f"https://api.pwnedpasswords.com/range/{prefix}"
-            response = requests.get(url)
+            response = await run_in_threadpool(requests.get, url)
             
             if suffix in response.text:
                 return {"success": True, "is_pwned": True, "message": "Password found in data breaches"}
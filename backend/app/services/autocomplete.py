@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.database import SessionLocal
+from ..models.user import User
+from ..models.follow import Follow
+from ..models.hashtag import Hashtag
+from ..models.user_stats import UserStats
+from .ranking_service import top_k
+
+MAX_RESULTS = 20  # per prefix, cached once and sliced per request
+CACHE_SIZE = 10_000  # hot prefixes kept per index
+REBUILD_AFTER = 5_000  # entries added since the last build before the arrays are rebuilt
+# Transactions commit after the updated_at they wrote, so each refresh re-reads a margin
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+class PrefixIndex:
+    """Top entries by weight under a prefix.
+
+    Keys live in one sorted list with numpy arrays of ids and weights beside
+    it, so a prefix is a bisect to a contiguous range and its best entries an
+    argpartition over that slice. Entries added since the last build sit in a
+    small side table and are merged in on read. Results per prefix are kept in
+    an LRU; a change to an entry evicts just the prefixes of its key.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, int, int]] = ()):
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._build(entries)
+
+    def _build(self, entries: Iterable[Tuple[str, str, int, int]]):
+        """entries are (key, label, id, weight); keys are lower-cased labels"""
+        rows = sorted(entries)
+        self.keys = [row[0] for row in rows]
+        self.labels = [row[1] for row in rows]
+        self.ids = np.array([row[2] for row in rows], dtype=np.int64)
+        self.weights = np.array([row[3] for row in rows], dtype=np.int64)
+        self.positions = {int(entry_id): position for position, entry_id in enumerate(self.ids)}
+        self.added: Dict[int, list] = {}  # id -> [key, label, weight]
+        self.cache.clear()
+
+    def _evict(self, key: str):
+        for end in range(1, len(key) + 1):
+            self.cache.pop(key[:end], None)
+
+    def add(self, entry_id: int, label: str, weight: int = 0):
+        key = label.lower()
+        with self.lock:
+            if entry_id in self.positions or entry_id in self.added:
+                return
+            self.added[entry_id] = [key, label, weight]
+            self._evict(key)
+            if len(self.added) >= REBUILD_AFTER:
+                self._build(self._entries())
+
+    def adjust(self, entry_id: int, delta: int):
+        with self.lock:
+            position = self.positions.get(entry_id)
+            if position is not None:
+                self.weights[position] += delta
+                self._evict(self.keys[position])
+            elif entry_id in self.added:
+                self.added[entry_id][2] += delta
+                self._evict(self.added[entry_id][0])
+
+    def set_weight(self, entry_id: int, weight: int):
+        with self.lock:
+            position = self.positions.get(entry_id)
+            if position is not None:
+                if self.weights[position] != weight:
+                    self.weights[position] = weight
+                    self._evict(self.keys[position])
+            elif entry_id in self.added and self.added[entry_id][2] != weight:
+                self.added[entry_id][2] = weight
+                self._evict(self.added[entry_id][0])
+
+    def _entries(self):
+        built = zip(self.keys, self.labels, self.ids.tolist(), self.weights.tolist())
+        return list(built) + [(key, label, entry_id, weight) for entry_id, (key, label, weight) in self.added.items()]
+
+    def top(self, prefix: str, k: int) -> List[dict]:
+        prefix = prefix.lower()
+        with self.lock:
+            cached = self.cache.get(prefix)
+            if cached is not None:
+                self.cache.move_to_end(prefix)
+                return cached[:k]
+
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + "\U0010ffff", lo)
+            matches = [
+                (int(self.weights[lo + i]), self.keys[lo + i], self.labels[lo + i], int(self.ids[lo + i]))
+                for i in top_k(self.weights[lo:hi], MAX_RESULTS)
+            ]
+            matches += [
+                (weight, key, label, entry_id)
+                for entry_id, (key, label, weight) in self.added.items() if key.startswith(prefix)
+            ]
+            matches.sort(key=lambda match: (-match[0], match[1]))
+            results = [{"id": entry_id, "label": label, "weight": weight} for weight, _, label, entry_id in matches[:MAX_RESULTS]]
+
+            self.cache[prefix] = results
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.popitem(last=False)
+            return results[:k]
+
+    def replace(self, fresh: "PrefixIndex"):
+        with self.lock:
+            self.keys, self.labels, self.ids, self.weights = fresh.keys, fresh.labels, fresh.ids, fresh.weights
+            self.positions, self.added = fresh.positions, fresh.added
+            self.cache.clear()
+
+class Autocomplete:
+    """Typeahead over usernames, weighted by followers, and hashtags, weighted by usage.
+
+    Weights are kept current by register, follow, unfollow and hashtag
+    changes in this process. refresh() applies other workers' changes from
+    the updated_at of users, user_stats and hashtags, so only rows that
+    changed are read; the full load runs once, at startup.
+    """
+
+    def __init__(self):
+        self.users = PrefixIndex()
+        self.hashtags = PrefixIndex()
+        self.since = None  # database time the last load or refresh started
+
+    def load(self, db: Session):
+        started = db.query(func.now()).scalar()
+        followers = dict(db.query(Follow.following_id, func.count(Follow.id)).group_by(Follow.following_id).all())
+        users = PrefixIndex(
+            (username.lower(), username, user_id, followers.get(user_id, 0))
+            for user_id, username in db.query(User.id, User.username).yield_per(10_000)
+        )
+        hashtags = PrefixIndex(
+            (name.lower(), name, hashtag_id, usage_count or 0)
+            for hashtag_id, name, usage_count in db.query(Hashtag.id, Hashtag.name, Hashtag.usage_count).yield_per(10_000)
+        )
+        self.users.replace(users)
+        self.hashtags.replace(hashtags)
+        self.since = started
+
+    def refresh(self, db: Session):
+        """Add users and hashtags created since the last load or refresh and update
+        the weights that changed, on any worker"""
+        if self.since is None:
+            return
+        started = db.query(func.now()).scalar()
+        cutoff = self.since - REFRESH_OVERLAP
+        for user_id, username in db.query(User.id, User.username).filter(User.updated_at >= cutoff):
+            self.users.add(user_id, username)
+        for user_id, followers in db.query(UserStats.user_id, UserStats.followers_count).filter(UserStats.updated_at >= cutoff):
+            self.users.set_weight(user_id, followers)
+        for hashtag_id, name, usage_count in db.query(Hashtag.id, Hashtag.name, Hashtag.usage_count).filter(Hashtag.updated_at >= cutoff):
+            self.hashtags.add(hashtag_id, name)
+            self.hashtags.set_weight(hashtag_id, usage_count or 0)
+        self.since = started
+
+    def suggest(self, q: str, k: int) -> dict:
+        """'@' limits to users and '#' to hashtags"""
+        scope, prefix = (q[0], q[1:]) if q[:1] in ("@", "#") else ("", q)
+        if not prefix:
+            return {"users": [], "hashtags": []}
+        return {
+            "users": [
+                {"id": entry["id"], "username": entry["label"], "followers_count": entry["weight"]}
+                for entry in self.users.top(prefix, k)
+            ] if scope != "#" else [],
+            "hashtags": [
+                {"id": entry["id"], "name": entry["label"], "usage_count": entry["weight"]}
+                for entry in self.hashtags.top(prefix, k)
+            ] if scope != "@" else []
+        }
+
+autocomplete = Autocomplete()
+
+def refresh_autocomplete():
+    db = SessionLocal()
+    try:
+        autocomplete.refresh(db)
+    finally:
+        db.close()
+
+async def run_autocomplete_refresh_loop(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh_autocomplete)
+        except Exception as e:
+            print(f"Autocomplete refresh failed: {e}")
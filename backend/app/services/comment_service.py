@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session, aliased
+from ..core.pagination import encode_cursor, keyset_filter, sort_key
+from ..models.post import Comment
+from ..models.comment_reply import CommentReply
+from ..models.user import User
+from .user_loader import UserLoader
+
+class CommentService:
+    def __init__(self, db: Session, users: Optional[UserLoader] = None):
+        self.db = db
+        self.users = users or UserLoader(db)
+
+    def stamp(self, post_id: int) -> tuple:
+        """Cheap validator for a post's thread: changes whenever a comment or reply is
+        added or removed, or one of their authors updates their profile"""
+        comment_ids = select(Comment.id).where(Comment.post_id == post_id)
+        authors = union(
+            select(Comment.author_id).where(Comment.post_id == post_id),
+            select(CommentReply.author_id).where(CommentReply.comment_id.in_(comment_ids))
+        )
+        return self.db.query(
+            select(func.count(Comment.id)).where(Comment.post_id == post_id).scalar_subquery(),
+            select(func.max(Comment.id)).where(Comment.post_id == post_id).scalar_subquery(),
+            select(func.count(CommentReply.id)).where(CommentReply.comment_id.in_(comment_ids)).scalar_subquery(),
+            select(func.max(CommentReply.id)).where(CommentReply.comment_id.in_(comment_ids)).scalar_subquery(),
+            select(func.max(User.updated_at)).where(User.id.in_(authors)).scalar_subquery()
+        ).one()
+
+    def page(self, post_id: int, cursor: Optional[str], limit: int, replies_per_comment: int) -> Tuple[List[dict], Optional[str]]:
+        """Newest comments first, each with its reply count and oldest replies, in three
+        queries; authors of comments and replies are loaded together, once each"""
+        query = self.db.query(Comment, sort_key(Comment.created_at)).filter(Comment.post_id == post_id).order_by(Comment.created_at.desc(), Comment.id.desc())
+        after = keyset_filter(Comment.created_at, Comment.id, cursor)
+        if after is not None:
+            query = query.filter(after)
+        rows = query.limit(limit).all()
+
+        next_cursor = None
+        if len(rows) == limit:
+            last_comment, last_key = rows[-1]
+            next_cursor = encode_cursor(last_key, last_comment.id)
+
+        comments = [comment for comment, _ in rows]
+        replies, counts = self.replies([comment.id for comment in comments], replies_per_comment)
+        authors = self.users.load_many(
+            [comment.author_id for comment in comments] +
+            [reply.author_id for rows in replies.values() for reply in rows]
+        )
+        return [{
+            "id": comment.id,
+            "content": comment.content,
+            "post_id": comment.post_id,
+            "author_id": comment.author_id,
+            "author": authors.get(comment.author_id),
+            "created_at": comment.created_at,
+            "replies_count": counts.get(comment.id, 0),
+            "replies": [{
+                "id": reply.id,
+                "comment_id": reply.comment_id,
+                "content": reply.content,
+                "author_id": reply.author_id,
+                "author": authors.get(reply.author_id),
+                "created_at": reply.created_at
+            } for reply in replies.get(comment.id, [])]
+        } for comment in comments], next_cursor
+
+    def replies(self, comment_ids: List[int], per_comment: int):
+        """First `per_comment` replies of each comment and its total reply count, in one windowed query"""
+        if not comment_ids:
+            return {}, {}
+        ranked = select(
+            CommentReply.id,
+            func.row_number().over(
+                partition_by=CommentReply.comment_id,
+                order_by=(CommentReply.created_at, CommentReply.id)
+            ).label("position"),
+            func.count().over(partition_by=CommentReply.comment_id).label("total")
+        ).where(CommentReply.comment_id.in_(comment_ids)).subquery()
+        reply = aliased(CommentReply)
+        rows = self.db.query(reply, ranked.c.total).join(ranked, ranked.c.id == reply.id).filter(
+            # Keep one row per comment even when no reply is returned, so the total survives
+            (ranked.c.position <= per_comment) | (ranked.c.position == 1)
+        ).order_by(reply.comment_id, ranked.c.position).all()
+
+        replies, counts = {}, {}
+        for row, total in rows:
+            counts[row.comment_id] = total
+            if per_comment:
+                replies.setdefault(row.comment_id, []).append(row)
+        return replies, counts
@@ -0,0 +1,173 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..core.database import AsyncSessionLocal
+from ..core.pagination import encode_cursor, decode_cursor
+from ..models.message import Message
+from ..models.conversation import Conversation
+
+PREVIEW_LENGTH = 100
+HISTORY_PAGE_SIZE = 50
+
+def between(user_id: int, partner_id: int):
+    """Messages in either direction between two users; each side is a range of
+    ix_messages_sender_id_receiver_id_created_at"""
+    return or_(
+        and_(Message.sender_id == user_id, Message.receiver_id == partner_id),
+        and_(Message.sender_id == partner_id, Message.receiver_id == user_id)
+    )
+
+LAST_MESSAGE_FIELDS = ("last_message_id", "last_message_at", "last_sender_id", "preview")
+
+class ConversationService:
+    """Maintains the conversations read model and serves the inbox from it.
+
+    Each message touches the sender's and the receiver's row in one upsert;
+    only the receiver's unread count goes up. Callers own the transaction, so
+    the rows commit or roll back with the message.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, message: Message):
+        """Make `message` the last one of its conversation; the message must be flushed"""
+        if message.receiver_id == message.sender_id:
+            # Notes to self never showed up in the inbox
+            return
+        last = {
+            "last_message_id": message.id,
+            "last_message_at": message.created_at,
+            "last_sender_id": message.sender_id,
+            "preview": (message.content or "")[:PREVIEW_LENGTH]
+        }
+        rows = [
+            dict(last, user_id=message.sender_id, partner_id=message.receiver_id, unread_count=0),
+            dict(last, user_id=message.receiver_id, partner_id=message.sender_id, unread_count=1)
+        ]
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            module = postgresql if dialect == "postgresql" else sqlite
+            statement = module.insert(Conversation).values(rows)
+            # A slower transaction may commit an older message after a newer one
+            newer = statement.excluded.last_message_id > Conversation.last_message_id
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=["user_id", "partner_id"],
+                set_={
+                    "unread_count": Conversation.unread_count + statement.excluded.unread_count,
+                    **{
+                        name: case((newer, getattr(statement.excluded, name)), else_=getattr(Conversation, name))
+                        for name in LAST_MESSAGE_FIELDS
+                    }
+                }
+            ))
+            return
+        for row in rows:
+            result = self.db.execute(
+                update(Conversation).where(
+                    Conversation.user_id == row["user_id"], Conversation.partner_id == row["partner_id"]
+                ).values(dict(last, unread_count=Conversation.unread_count + row["unread_count"]))
+            )
+            if not result.rowcount:
+                self.db.execute(insert(Conversation).values(row))
+
+    def mark_read_up_to(self, reader_id: int, sender_id: int, up_to_id: int) -> Optional[int]:
+        """Mark everything sender_id sent reader_id up to `up_to_id` as delivered and read.
+
+        One bounded UPDATE whatever the number of messages. Returns the
+        high-water mark to put in the read receipt, or None when nothing new
+        was read.
+        """
+        result = self.db.execute(
+            update(Message).where(
+                Message.sender_id == sender_id, Message.receiver_id == reader_id,
+                Message.id <= up_to_id, Message.is_read == False
+            ).values(is_read=True, is_delivered=True)
+        )
+        if not result.rowcount:
+            return None
+        read = result.rowcount
+        self.db.execute(
+            update(Conversation).where(
+                Conversation.user_id == reader_id, Conversation.partner_id == sender_id
+            ).values(unread_count=case((Conversation.unread_count > read, Conversation.unread_count - read), else_=0))
+        )
+        last_message_id = self.db.query(Conversation.last_message_id).filter(
+            Conversation.user_id == reader_id, Conversation.partner_id == sender_id
+        ).scalar()
+        return min(up_to_id, last_message_id) if last_message_id else up_to_id
+
+    def inbox(self, user_id: int, cursor: Optional[str], limit: int) -> Tuple[List[Conversation], Optional[str]]:
+        """Most recently active conversations first, one range scan of
+        ix_conversations_user_id_last_message_id per page"""
+        query = self.db.query(Conversation).filter(Conversation.user_id == user_id)
+        if cursor:
+            last_message_id, = decode_cursor(cursor, size=1)
+            query = query.filter(Conversation.last_message_id < last_message_id)
+        rows = query.order_by(Conversation.last_message_id.desc()).limit(limit).all()
+        next_cursor = encode_cursor(rows[-1].last_message_id) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def history(
+        self, user_id: int, partner_id: int,
+        before_id: Optional[int] = None, after_id: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE
+    ) -> List[Message]:
+        """One page of a chat, newest first.
+
+        Without a cursor this is the latest `limit` messages; `before_id` pages
+        back through older ones and `after_id` returns the `limit` messages
+        that follow it. Messages are ordered by (created_at, id), with the
+        anchor's created_at read in the same statement.
+        """
+        query = self.db.query(Message).filter(between(user_id, partner_id))
+        anchor_id = before_id if before_id is not None else after_id
+        if anchor_id is not None:
+            anchor = select(Message.created_at).where(
+                Message.id == anchor_id, between(user_id, partner_id)
+            ).scalar_subquery()
+            if before_id is not None:
+                query = query.filter(or_(Message.created_at < anchor, and_(Message.created_at == anchor, Message.id < before_id)))
+            else:
+                query = query.filter(or_(Message.created_at > anchor, and_(Message.created_at == anchor, Message.id > after_id)))
+
+        if after_id is not None and before_id is None:
+            rows = query.order_by(Message.created_at, Message.id).limit(limit).all()
+            return rows[::-1]
+        return query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit).all()
+
+    def rebuild(self) -> int:
+        """Recompute every conversation row from the messages table"""
+        sides = union_all(
+            select(
+                Message.sender_id.label("user_id"), Message.receiver_id.label("partner_id"),
+                Message.id.label("message_id"), literal(0).label("unread")
+            ).where(Message.receiver_id != Message.sender_id),
+            select(
+                Message.receiver_id, Message.sender_id,
+                Message.id, case((Message.is_read == False, 1), else_=0)
+            ).where(Message.receiver_id != Message.sender_id)
+        ).subquery()
+        latest = select(
+            sides.c.user_id, sides.c.partner_id,
+            func.max(sides.c.message_id).label("last_message_id"),
+            func.sum(sides.c.unread).label("unread_count")
+        ).group_by(sides.c.user_id, sides.c.partner_id).subquery()
+        rows = select(
+            latest.c.user_id, latest.c.partner_id, latest.c.last_message_id,
+            Message.created_at, Message.sender_id, func.substr(Message.content, 1, PREVIEW_LENGTH), latest.c.unread_count
+        ).join(Message, Message.id == latest.c.last_message_id)
+
+        self.db.execute(delete(Conversation))
+        self.db.execute(insert(Conversation).from_select(
+            ["user_id", "partner_id", *LAST_MESSAGE_FIELDS, "unread_count"], rows
+        ))
+        return self.db.query(func.count(Conversation.id)).scalar()
+
+async def mark_read_up_to(reader_id: int, sender_id: int, up_to_id: int) -> Optional[int]:
+    """ConversationService.mark_read_up_to in its own async session, for the chat socket"""
+    async with AsyncSessionLocal() as db:
+        up_to = await db.run_sync(lambda session: ConversationService(session).mark_read_up_to(reader_id, sender_id, up_to_id))
+        await db.commit()
+        return up_to
@@ -0,0 +1,402 @@
+import asyncio
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Set, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.follow import Follow
+from .ranking_service import top_k
+
+EMPTY = np.empty(0, dtype=np.int32)
+
+class Adjacency:
+    """One direction of the follow graph.
+
+    Built as CSR arrays indexed by user id: the neighbours of u are
+    indices[indptr[u]:indptr[u + 1]], sorted, so membership is a binary
+    search. Edges added or removed since the build are kept per user in small
+    overlay sets and folded in on read until the next compaction.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.added: Dict[int, Set[int]] = {}
+        self.removed: Dict[int, Set[int]] = {}
+        self.changes = 0
+
+    @classmethod
+    def from_edges(cls, sources: np.ndarray, targets: np.ndarray) -> "Adjacency":
+        order = np.lexsort((targets, sources))
+        size = int(sources.max(initial=-1)) + 1
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=size)))).astype(np.int64)
+        return cls(indptr, targets[order].astype(np.int32))
+
+    def base(self, node: int) -> np.ndarray:
+        if node < 0 or node + 1 >= len(self.indptr):
+            return EMPTY
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def in_base(self, a: int, b: int) -> bool:
+        row = self.base(a)
+        i = np.searchsorted(row, b)
+        return bool(i < len(row) and row[i] == b)
+
+    def has(self, a: int, b: int) -> bool:
+        if b in self.added.get(a, ()):
+            return True
+        if b in self.removed.get(a, ()):
+            return False
+        return self.in_base(a, b)
+
+    def add(self, a: int, b: int):
+        if b in self.removed.get(a, ()):
+            self.removed[a].discard(b)
+        elif not self.in_base(a, b):
+            self.added.setdefault(a, set()).add(b)
+        self.changes += 1
+
+    def remove(self, a: int, b: int):
+        if b in self.added.get(a, ()):
+            self.added[a].discard(b)
+        elif self.in_base(a, b):
+            self.removed.setdefault(a, set()).add(b)
+        self.changes += 1
+
+    def overlay(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Pending (added, removed) edges as n x 2 arrays"""
+        return tuple(
+            np.array([(a, b) for a, targets in changes.items() for b in targets], dtype=np.int64).reshape(-1, 2)
+            for changes in (self.added, self.removed)
+        )
+
+    def frozen(self) -> "Adjacency":
+        """Copy sharing the arrays, with its own overlay, for building outside the lock"""
+        copy = Adjacency(self.indptr, self.indices)
+        copy.added = {a: set(targets) for a, targets in self.added.items() if targets}
+        copy.removed = {a: set(targets) for a, targets in self.removed.items() if targets}
+        return copy
+
+    def degree(self, node: int) -> int:
+        return len(self.base(node)) - len(self.removed.get(node, ())) + len(self.added.get(node, ()))
+
+    def row(self, node: int) -> np.ndarray:
+        """Sorted neighbours of node, overlay applied"""
+        row = self.base(node)
+        if self.removed.get(node):
+            row = row[~np.isin(row, np.fromiter(self.removed[node], dtype=np.int32))]
+        if self.added.get(node):
+            row = np.union1d(row, np.fromiter(self.added[node], dtype=np.int32))
+        return row
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every current edge as (sources, targets)"""
+        sources = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))
+        targets = self.indices.astype(np.int64)
+        added, removed = self.overlay()
+        if len(removed):
+            keep = ~np.isin((sources << 32) | targets, (removed[:, 0] << 32) | removed[:, 1])
+            sources, targets = sources[keep], targets[keep]
+        return np.concatenate((sources, added[:, 0])), np.concatenate((targets, added[:, 1]))
+
+def gather(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Concatenated CSR rows of `nodes`, in one vectorized step"""
+    nodes = nodes[nodes + 1 < len(indptr)]
+    starts, ends = indptr[nodes], indptr[nodes + 1]
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return EMPTY
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[offsets + np.arange(total)]
+
+class FollowGraph:
+    """The whole follows table in memory, for degree, membership, mutual and 2-hop queries.
+
+    Loaded at startup, from the snapshot file when it is still current, and
+    kept up to date by follow_user and unfollow_user in this worker. Other
+    workers' changes are picked up by refresh(), which applies follows rows
+    newer than the watermark and reloads everything when the row count shows
+    follows were deleted elsewhere. Changes collect in the overlays until the
+    periodic snapshot compacts them into new arrays; arrays are always built
+    outside the lock and changes made meanwhile are replayed.
+
+    Follow lists, follow counts and is_following are answered from here
+    once the graph is ready. A follow or unfollow shows up at once on the
+    worker that served it and within one refresh interval on the others.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.following = Adjacency.from_edges(EMPTY, EMPTY)
+        self.followers = Adjacency.from_edges(EMPTY, EMPTY)
+        self.watermark = 0  # every follows row up to this id has been read from the database
+        self.edge_count = 0
+        self.unseen: Dict[Tuple[int, int], int] = {}  # follows added here with ids above the watermark
+        self.ready = False
+        self.compacting = threading.Lock()
+        self.replay: Optional[list] = None  # changes made while a compaction is running
+
+    def _build(self, sources: np.ndarray, targets: np.ndarray):
+        self.following = Adjacency.from_edges(sources, targets)
+        self.followers = Adjacency.from_edges(targets, sources)
+        self.edge_count = len(sources)
+
+    # Updates
+
+    def add(self, follower_id: int, following_id: int, follow_id: Optional[int] = None):
+        with self.lock:
+            if self.following.has(follower_id, following_id):
+                return
+            self.following.add(follower_id, following_id)
+            self.followers.add(following_id, follower_id)
+            self.edge_count += 1
+            if follow_id and follow_id > self.watermark:
+                self.unseen[follower_id, following_id] = follow_id
+            if self.replay is not None:
+                self.replay.append((True, follower_id, following_id))
+
+    def remove(self, follower_id: int, following_id: int):
+        with self.lock:
+            if not self.following.has(follower_id, following_id):
+                return
+            self.following.remove(follower_id, following_id)
+            self.followers.remove(following_id, follower_id)
+            self.edge_count -= 1
+            self.unseen.pop((follower_id, following_id), None)
+            if self.replay is not None:
+                self.replay.append((False, follower_id, following_id))
+
+    def compact(self):
+        """Fold the overlays into fresh CSR arrays without blocking readers during the sort"""
+        with self.compacting:
+            with self.lock:
+                if not self.following.changes:
+                    return
+                frozen = self.following.frozen()
+                self.replay = []
+            sources, targets = frozen.edges()
+            self._swap(sources, targets)
+
+    def _swap(self, sources: np.ndarray, targets: np.ndarray):
+        """Install arrays built from these edges, replaying the changes made since
+        self.replay was opened; caller holds self.compacting"""
+        following = Adjacency.from_edges(sources, targets)
+        followers = Adjacency.from_edges(targets, sources)
+        with self.lock:
+            edge_count = len(sources)
+            for added, follower_id, following_id in self.replay:
+                if added and not following.has(follower_id, following_id):
+                    following.add(follower_id, following_id)
+                    followers.add(following_id, follower_id)
+                    edge_count += 1
+                elif not added and following.has(follower_id, following_id):
+                    following.remove(follower_id, following_id)
+                    followers.remove(following_id, follower_id)
+                    edge_count -= 1
+            self.following, self.followers = following, followers
+            self.edge_count = edge_count
+            self.replay = None
+
+    # Queries
+
+    def follows(self, follower_id: int, following_id: int) -> bool:
+        with self.lock:
+            return self.following.has(follower_id, following_id)
+
+    def followers_count(self, user_id: int) -> int:
+        with self.lock:
+            return self.followers.degree(user_id)
+
+    def following_count(self, user_id: int) -> int:
+        with self.lock:
+            return self.following.degree(user_id)
+
+    def following_ids(self, user_id: int) -> np.ndarray:
+        with self.lock:
+            return self.following.row(user_id).copy()
+
+    def follower_ids(self, user_id: int) -> np.ndarray:
+        with self.lock:
+            return self.followers.row(user_id).copy()
+
+    def mutuals(self, user_id: int) -> np.ndarray:
+        """Users who follow user_id back"""
+        with self.lock:
+            return np.intersect1d(self.following.row(user_id), self.followers.row(user_id), assume_unique=True)
+
+    def common_following(self, a: int, b: int) -> np.ndarray:
+        """Users both a and b follow"""
+        with self.lock:
+            return np.intersect1d(self.following.row(a), self.following.row(b), assume_unique=True)
+
+    def two_hop(self, user_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Users followed by people user_id follows, with how many of them follow each;
+        excludes user_id and the people they already follow"""
+        with self.lock:
+            followed = self.following.row(user_id)
+            reached = [gather(self.following.indptr, self.following.indices, followed.astype(np.int64))]
+            reached += [np.fromiter(self.following.added[node], dtype=np.int32) for node in followed.tolist() if self.following.added.get(node)]
+            removed = [(node, np.fromiter(self.following.removed[node], dtype=np.int32)) for node in followed.tolist() if self.following.removed.get(node)]
+        candidates, counts = np.unique(np.concatenate(reached), return_counts=True)
+        for _, targets in removed:
+            # Base edges dropped since the last compaction still sit in the arrays
+            counts -= np.isin(candidates, targets)
+        keep = (counts > 0) & (candidates != user_id) & ~np.isin(candidates, followed)
+        return candidates[keep], counts[keep]
+
+    def most_followed(self, k: int) -> list:
+        """Users with the most followers as of the last compaction"""
+        with self.lock:
+            counts = np.diff(self.followers.indptr)
+        return [int(user_id) for user_id in top_k(counts.astype(np.float64), k) if counts[user_id]]
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(indptr, indices) of who each user follows as of the last compaction; the
+        arrays are never modified in place, so they are safe to read without the lock"""
+        with self.lock:
+            return self.following.indptr, self.following.indices
+
+    # Loading and snapshots
+
+    def load(self, db: Session):
+        """Build the graph from the follows table, replacing whatever it held.
+
+        Follows and unfollows made in this worker while the table is read are
+        replayed on top, so a reload never loses them.
+        """
+        with self.compacting:
+            with self.lock:
+                self.replay = []
+            rows = np.array(db.query(Follow.id, Follow.follower_id, Follow.following_id).all(), dtype=np.int64).reshape(-1, 3)
+            self._swap(rows[:, 1], rows[:, 2])
+            with self.lock:
+                self.watermark = int(rows[:, 0].max(initial=0))
+                self.unseen = {edge: follow_id for edge, follow_id in self.unseen.items() if follow_id > self.watermark}
+                self.ready = True
+
+    def refresh(self, db: Session) -> bool:
+        """Catch up on follows made by other workers; True if a full reload was needed.
+
+        New rows are found by id above the watermark. Deletions leave no row
+        behind, so they, and rows whose id was allocated before the watermark
+        but committed after it, show up as a row count that differs from the
+        graph's, and the graph is then rebuilt from scratch.
+        """
+        with self.lock:
+            watermark = self.watermark
+        newer = db.query(Follow.id, Follow.follower_id, Follow.following_id).filter(
+            Follow.id > watermark
+        ).order_by(Follow.id).all()
+        latest = newer[-1][0] if newer else watermark
+        total = db.query(func.count(Follow.id)).filter(Follow.id <= latest).scalar()
+        with self.lock:
+            for follow_id, follower_id, following_id in newer:
+                if not self.following.has(follower_id, following_id):
+                    self.following.add(follower_id, following_id)
+                    self.followers.add(following_id, follower_id)
+                    self.edge_count += 1
+                    if self.replay is not None:
+                        self.replay.append((True, follower_id, following_id))
+            self.watermark = max(self.watermark, latest)
+            self.unseen = {edge: follow_id for edge, follow_id in self.unseen.items() if follow_id > self.watermark}
+            # Follows added here after `latest` are in the graph but not in `total`
+            expected = self.edge_count - len(self.unseen)
+        if total == expected:
+            return False
+        self.load(db)
+        return True
+
+    def save(self, path: str):
+        self.compact()
+        with self.lock:
+            following, followers = self.following, self.followers
+            # Changes that raced the compaction are written as an overlay
+            added, removed = following.overlay()
+            meta = np.array([self.watermark, self.edge_count], dtype=np.int64)
+        # Every worker writes the snapshot, each through its own temporary file
+        directory, name = os.path.split(os.path.abspath(path))
+        descriptor, temporary = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                np.savez(
+                    f, meta=meta, added=added, removed=removed,
+                    following_indptr=following.indptr, following_indices=following.indices,
+                    followers_indptr=followers.indptr, followers_indices=followers.indices
+                )
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def restore(self, db: Session, path: str) -> bool:
+        """Load from the snapshot and apply newer follows; False if it is missing or stale"""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as snapshot:
+            watermark, edge_count = (int(value) for value in snapshot["meta"])
+            following = Adjacency(snapshot["following_indptr"], snapshot["following_indices"])
+            followers = Adjacency(snapshot["followers_indptr"], snapshot["followers_indices"])
+            added, removed = snapshot["added"].tolist(), snapshot["removed"].tolist()
+        for follower_id, following_id in added:
+            following.add(follower_id, following_id)
+            followers.add(following_id, follower_id)
+        for follower_id, following_id in removed:
+            following.remove(follower_id, following_id)
+            followers.remove(following_id, follower_id)
+
+        newer = db.query(Follow.id, Follow.follower_id, Follow.following_id).filter(Follow.id > watermark).all()
+        total = db.query(func.count(Follow.id)).scalar()
+        if total != edge_count + len(newer):
+            # Follows covered by the snapshot were deleted since it was written
+            return False
+
+        with self.lock:
+            self.following, self.followers = following, followers
+            self.watermark, self.edge_count = watermark, edge_count
+            for follow_id, follower_id, following_id in newer:
+                self.following.add(follower_id, following_id)
+                self.followers.add(following_id, follower_id)
+                self.edge_count += 1
+                self.watermark = max(self.watermark, follow_id)
+            self.ready = True
+        return True
+
+follow_graph = FollowGraph()
+
+def start_follow_graph(db: Session):
+    path = settings.FOLLOW_GRAPH_SNAPSHOT
+    try:
+        if follow_graph.restore(db, path):
+            return
+    except Exception as e:
+        print(f"Follow graph snapshot unusable: {e}")
+    follow_graph.load(db)
+
+def refresh_follow_graph():
+    db = SessionLocal()
+    try:
+        follow_graph.refresh(db)
+    finally:
+        db.close()
+
+async def run_follow_graph_refresh_loop(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh_follow_graph)
+        except Exception as e:
+            print(f"Follow graph refresh failed: {e}")
+
+async def run_follow_graph_snapshot_loop(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(follow_graph.save, settings.FOLLOW_GRAPH_SNAPSHOT)
+        except Exception as e:
+            print(f"Follow graph snapshot failed: {e}")
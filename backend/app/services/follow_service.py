@@ -0,0 +1,67 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, aliased
+from ..core.pagination import decode_cursor, encode_cursor
+from ..models.follow import Follow
+from ..models.user import User
+from .follow_graph import follow_graph
+
+class FollowService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def page(
+        self,
+        user_id: int,
+        followers: bool,
+        viewer_id: Optional[int],
+        cursor: Optional[str],
+        limit: int
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Newest follows first, for user_id's followers or the accounts they follow.
+
+        The page of users comes from one range of the follows index. Follower
+        counts and whether the viewer follows them are read from the follow
+        graph, or from the same query when the graph is not loaded.
+        """
+        own, other = (Follow.following_id, Follow.follower_id) if followers else (Follow.follower_id, Follow.following_id)
+        page = select(Follow.id, other.label("user_id")).where(own == user_id)
+        if cursor:
+            page = page.where(Follow.id < decode_cursor(cursor, size=1)[0])
+        page = page.order_by(Follow.id.desc()).limit(limit).subquery()
+
+        if follow_graph.ready:
+            rows = [
+                (follow_id, user, follow_graph.followers_count(user.id), bool(viewer_id) and follow_graph.follows(viewer_id, user.id))
+                for follow_id, user in self.db.query(page.c.id, User).join(
+                    User, User.id == page.c.user_id
+                ).order_by(page.c.id.desc()).all()
+            ]
+        else:
+            rows = self._counted(page, viewer_id)
+
+        next_cursor = encode_cursor(rows[-1][0]) if len(rows) == limit else None
+        return [{
+            "id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "profile_photo": user.profile_photo,
+            "followers_count": followers_count,
+            "is_following": bool(is_following)
+        } for _, user, followers_count, is_following in rows], next_cursor
+
+    def _counted(self, page, viewer_id: Optional[int]) -> list:
+        """(follow id, user, followers_count, is_following) for a page of follows, in one query"""
+        counted = aliased(Follow)
+        counts = select(counted.following_id, func.count(counted.id).label("followers_count")).where(
+            counted.following_id.in_(select(page.c.user_id))
+        ).group_by(counted.following_id).subquery()
+
+        viewer = aliased(Follow)
+        return self.db.query(
+            page.c.id, User, func.coalesce(counts.c.followers_count, 0), viewer.id.isnot(None)
+        ).join(User, User.id == page.c.user_id).outerjoin(
+            counts, counts.c.following_id == User.id
+        ).outerjoin(
+            viewer, and_(viewer.follower_id == viewer_id, viewer.following_id == User.id)
+        ).order_by(page.c.id.desc()).all()
@@ -0,0 +1,96 @@
+import re
+from typing import Dict, Iterable, Set, Tuple
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models.hashtag import Hashtag, post_hashtags
+from .autocomplete import autocomplete
+
+HASHTAG_PATTERN = re.compile(r"(?<![\w#])#(\w{1,100})", re.UNICODE)
+
+def extract_hashtags(text: str) -> Set[str]:
+    """Lower-cased tag names in the text, without the leading #"""
+    return {match.lower() for match in HASHTAG_PATTERN.findall(text or "") if not match.isdigit()}
+
+class HashtagService:
+    """Keeps hashtags, post_hashtags and usage_count in step with post content.
+
+    Every statement is a set-based insert, update or delete, so the number of
+    round trips does not depend on how many tags a post carries. Callers own
+    the transaction, and call publish() once it has committed so the in-memory
+    autocomplete index never counts tags from a rolled-back write.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.pending: Dict[int, Tuple[str, int]] = {}
+
+    def tags_for_post(self, post_id: int) -> Set[str]:
+        rows = self.db.query(Hashtag.name).join(
+            post_hashtags, post_hashtags.c.hashtag_id == Hashtag.id
+        ).filter(post_hashtags.c.post_id == post_id).all()
+        return {row[0] for row in rows}
+
+    def ensure(self, names: Iterable[str]) -> Dict[str, int]:
+        """Upsert hashtag rows in one statement; returns name -> id"""
+        names = sorted(set(names))
+        if not names:
+            return {}
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            module = postgresql if dialect == "postgresql" else sqlite
+            self.db.execute(
+                module.insert(Hashtag).values([{"name": name, "usage_count": 0} for name in names]).on_conflict_do_nothing(
+                    index_elements=["name"]
+                )
+            )
+        else:
+            existing = {row[0] for row in self.db.query(Hashtag.name).filter(Hashtag.name.in_(names)).all()}
+            missing = [{"name": name, "usage_count": 0} for name in names if name not in existing]
+            if missing:
+                self.db.execute(insert(Hashtag), missing)
+        return dict(self.db.query(Hashtag.name, Hashtag.id).filter(Hashtag.name.in_(names)).all())
+
+    def sync(self, post_id: int, old_tags: Set[str], new_tags: Set[str]):
+        """Apply the difference between a post's previous and current tags"""
+        added, removed = new_tags - old_tags, old_tags - new_tags
+        if not added and not removed:
+            return
+        ids = self.ensure(added | removed)
+        added_ids = [ids[name] for name in added]
+        removed_ids = [ids[name] for name in removed]
+        for name in added | removed:
+            _, delta = self.pending.get(ids[name], (name, 0))
+            self.pending[ids[name]] = (name, delta + (1 if name in added else -1))
+
+        if added_ids:
+            self.db.execute(insert(post_hashtags), [{"post_id": post_id, "hashtag_id": tag_id} for tag_id in added_ids])
+            self.db.execute(
+                update(Hashtag).where(Hashtag.id.in_(added_ids)).values(usage_count=func.coalesce(Hashtag.usage_count, 0) + 1)
+            )
+        if removed_ids:
+            self.db.execute(
+                delete(post_hashtags).where(post_hashtags.c.post_id == post_id, post_hashtags.c.hashtag_id.in_(removed_ids))
+            )
+            self.db.execute(
+                update(Hashtag).where(Hashtag.id.in_(removed_ids)).values(usage_count=func.coalesce(Hashtag.usage_count, 0) - 1)
+            )
+
+    def publish(self):
+        """Apply synced usage changes to the autocomplete index; call after commit"""
+        for tag_id, (name, delta) in self.pending.items():
+            autocomplete.hashtags.add(tag_id, name)
+            if delta:
+                autocomplete.hashtags.adjust(tag_id, delta)
+        self.pending = {}
+
+    def on_create(self, post_id: int, content: str) -> Set[str]:
+        tags = extract_hashtags(content)
+        self.sync(post_id, set(), tags)
+        return tags
+
+    def on_edit(self, post_id: int, content: str):
+        self.sync(post_id, self.tags_for_post(post_id), extract_hashtags(content))
+
+    def on_delete(self, post_id: int):
+        self.sync(post_id, self.tags_for_post(post_id), set())
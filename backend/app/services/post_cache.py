@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..core.redis_client import redis_client
+from ..core.versions import read_versions
+from ..schemas.user import UserResponse
+from .post_service import PostService
+from .user_loader import UserLoader
+
+CACHE_TTL = 300
+
+class PostCache:
+    """Read-through cache for post payloads and feed pages"""
+
+    def __init__(self, db: Session, users: Optional[UserLoader] = None):
+        self.db = db
+        self.posts = PostService(db)
+        self.users = users or UserLoader(db)
+
+    def feed_page(self, user_id: Optional[int], cursor: Optional[str], skip: int, limit: int) -> Tuple[List[dict], Optional[str]]:
+        if user_id:
+            fields = [f"author_feed:{user_id}"]
+        elif cursor:
+            # Older pages only move when a post is deleted
+            fields = ["feed"]
+        else:
+            fields = ["feed", "feed:new"]
+        versions = read_versions(fields)
+        if versions is None:
+            post_ids, next_cursor = self.posts.feed_page_ids(user_id, cursor, skip, limit)
+            return self.posts.hydrate(self.posts.posts_by_ids(post_ids)), next_cursor
+
+        page_key = f"feed:{user_id or '*'}:{'.'.join(versions)}:{cursor or skip}:{limit}"
+        page = redis_client.get(page_key)
+        if page is None:
+            post_ids, next_cursor = self.posts.feed_page_ids(user_id, cursor, skip, limit)
+            page = {"post_ids": post_ids, "next_cursor": next_cursor}
+            redis_client.set(page_key, page, CACHE_TTL)
+        return self.load(page["post_ids"]), page["next_cursor"]
+
+    def load(self, post_ids: List[int]) -> List[dict]:
+        """Hydrated payloads for active posts, in the order given"""
+        if not post_ids:
+            return []
+        versions = read_versions([f"post:{post_id}" for post_id in post_ids])
+        if versions is None:
+            return self.posts.hydrate(self.posts.posts_by_ids(post_ids))
+        epoch, versions = versions[0], versions[1:]
+
+        keys = {post_id: f"post:{post_id}:{epoch}.{version}" for post_id, version in zip(post_ids, versions)}
+        docs = dict(zip(keys, redis_client.mget(list(keys.values()))))
+        missing = [post_id for post_id, doc in docs.items() if doc is None]
+        cards = {}
+        if missing:
+            fresh = {}
+            for item in self.posts.hydrate(self.posts.posts_by_ids(missing)):
+                cards[item["author_id"]] = UserResponse.from_orm(item.pop("author")).model_dump(mode="json")
+                docs[item["id"]] = fresh[keys[item["id"]]] = item
+            redis_client.set_many(fresh, CACHE_TTL)
+
+        found = [docs[post_id] for post_id in post_ids if docs[post_id] is not None]
+        authors = self._author_cards({doc["author_id"] for doc in found}, cards)
+        return [dict(doc, author=authors[doc["author_id"]]) for doc in found if doc["author_id"] in authors]
+
+    def _author_cards(self, author_ids, known: Dict[int, dict]) -> Dict[int, dict]:
+        author_ids = list(author_ids)
+        versions = read_versions([f"user:{author_id}" for author_id in author_ids])
+        keys = {}
+        cards = {author_id: None for author_id in author_ids}
+        if versions is not None:
+            epoch, versions = versions[0], versions[1:]
+            keys = {author_id: f"user:card:{author_id}:{epoch}.{version}" for author_id, version in zip(author_ids, versions)}
+            cards.update(zip(author_ids, redis_client.mget(list(keys.values()))))
+
+        for author_id, card in cards.items():
+            # Authors loaded alongside uncached posts were read before these
+            # versions, so they are served but not stored
+            if card is None and author_id in known:
+                cards[author_id] = known[author_id]
+        missing = [author_id for author_id, card in cards.items() if card is None]
+        if missing:
+            fresh = {}
+            for user in self.users.load_many(missing).values():
+                cards[user.id] = UserResponse.from_orm(user).model_dump(mode="json")
+                if user.id in keys:
+                    fresh[keys[user.id]] = cards[user.id]
+            redis_client.set_many(fresh, CACHE_TTL)
+        return {author_id: card for author_id, card in cards.items() if card is not None}
@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from ..core.pagination import encode_cursor, keyset_filter, sort_key
+from ..models.post import Post, Comment
+from .like_counter import LikeCounter
+
+class PostService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def active_posts(self):
+        """Active posts with their authors joined into the same SELECT"""
+        return self.db.query(Post).options(joinedload(Post.author)).filter(Post.is_active == True)
+
+    def comment_counts(self, post_ids: List[int]) -> Dict[int, int]:
+        if not post_ids:
+            return {}
+        rows = self.db.query(Comment.post_id, func.count(Comment.id)).filter(
+            Comment.post_id.in_(post_ids)
+        ).group_by(Comment.post_id).all()
+        return dict(rows)
+
+    def hydrate(self, posts: List[Post]) -> List[dict]:
+        """Build post payloads with one grouped comment count, whatever the page size"""
+        likes = LikeCounter(self.db).counts(posts)
+        comments = self.comment_counts([post.id for post in posts])
+
+        return [{
+            "id": post.id,
+            "content": post.content,
+            "image_url": post.image_url,
+            "author_id": post.author_id,
+            "author": post.author,
+            "likes_count": likes.get(post.id, 0),
+            "comments_count": comments.get(post.id, 0),
+            "created_at": post.created_at
+        } for post in posts]
+
+    def posts_by_ids(self, post_ids: List[int]) -> List[Post]:
+        """Active posts for the given ids, in the order the ids were given"""
+        if not post_ids:
+            return []
+        posts = {post.id: post for post in self.active_posts().filter(Post.id.in_(post_ids)).all()}
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    def feed_page_ids(self, user_id: Optional[int], cursor: Optional[str], skip: int, limit: int) -> Tuple[List[int], Optional[str]]:
+        """Post ids for one feed page, newest first, and the cursor for the next page if it is full"""
+        query = self.db.query(Post.id, sort_key(Post.created_at)).filter(Post.is_active == True)
+        if user_id:
+            query = query.filter(Post.author_id == user_id)
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+
+        # Keyset mode: seek past the (created_at, id) of the previous page's last post
+        after = keyset_filter(Post.created_at, Post.id, cursor)
+        if after is not None:
+            query = query.filter(after)
+        elif skip:
+            query = query.offset(skip)
+        rows = query.limit(limit).all()
+
+        next_cursor = None
+        if len(rows) == limit:
+            last_id, last_key = rows[-1]
+            next_cursor = encode_cursor(last_key, last_id)
+        return [row[0] for row in rows], next_cursor
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from ..core.redis_client import redis_client
+from ..core.versions import read_versions
+from ..models.user import User
+from .user_stats_service import UserStatsService
+
+CACHE_TTL = 300
+LOCAL_CACHE_SIZE = 10_000  # profiles kept in this process
+
+class LocalCache:
+    """Small thread-safe LRU for documents that are also cached in Redis"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: dict):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+local_profiles = LocalCache(LOCAL_CACHE_SIZE)
+
+class ProfileCache:
+    """Composite profile documents (user fields plus user_stats counters).
+
+    Keys embed the user's profile, post and follow version counters, so
+    update_my_profile, update_user_profile, new or deleted posts and follow
+    changes all retire the cached document without deleting anything. The
+    in-process LRU sits in front of Redis and uses the same versioned keys,
+    so it can never serve a document Redis would consider stale.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def versions(user_id: int) -> Optional[List[str]]:
+        return read_versions([f"user:{user_id}", f"author_feed:{user_id}", f"follows:{user_id}"])
+
+    def build(self, user_id: int) -> Optional[dict]:
+        user = self.db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        stats = UserStatsService(self.db).get(user_id)
+        return {
+            "id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "email": user.email,
+            "profile_photo": user.profile_photo,
+            "background_image": user.background_image,
+            "bio": user.bio,
+            **stats
+        }
+
+    def get(self, user_id: int, versions: Optional[List[str]]) -> Optional[dict]:
+        """Profile document, or None if the user does not exist; pass versions from versions()"""
+        if versions is None:
+            return self.build(user_id)
+
+        key = f"profile:{user_id}:{'.'.join(versions)}"
+        profile = local_profiles.get(key)
+        if profile is None:
+            profile = redis_client.get(key)
+            if profile is None:
+                profile = self.build(user_id)
+                if profile is None:
+                    return None
+                redis_client.set(key, profile, CACHE_TTL)
+            local_profiles.put(key, profile)
+        return profile
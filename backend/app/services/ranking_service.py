@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.post import Post
+from ..models.like import Like
+from ..models.follow import Follow
+from .post_service import PostService
+from .like_counter import LikeCounter
+
+class RankingWeights(BaseModel):
+    recency: float = 3.0
+    half_life_hours: float = 12.0
+    likes: float = 1.0
+    comments: float = 1.5
+    following: float = 2.0
+    liked_author: float = 1.0
+    media: float = 0.5
+
+class FeedCandidates(BaseModel):
+    """Column-oriented features for a candidate set, one array entry per post"""
+    post_ids: np.ndarray
+    author_ids: np.ndarray
+    created_at: np.ndarray  # epoch seconds
+    likes: np.ndarray
+    comments: np.ndarray
+    has_media: np.ndarray
+
+    class Config:
+        arbitrary_types_allowed = True
+
+def score_candidates(
+    candidates: FeedCandidates,
+    followed_authors: np.ndarray,
+    liked_authors: np.ndarray,
+    liked_counts: np.ndarray,
+    weights: RankingWeights,
+    now: float
+) -> np.ndarray:
+    """Score every candidate in one vectorized pass.
+
+    liked_authors must be sorted, with liked_counts[i] the number of the
+    viewer's past likes on posts by liked_authors[i].
+    """
+    age_hours = np.maximum(now - candidates.created_at, 0.0) / 3600.0
+    recency = np.exp2(-age_hours / weights.half_life_hours)
+
+    following = np.isin(candidates.author_ids, followed_authors)
+
+    affinity = np.zeros(len(candidates.author_ids))
+    if len(liked_authors):
+        idx = np.searchsorted(liked_authors, candidates.author_ids)
+        idx = np.minimum(idx, len(liked_authors) - 1)
+        matched = liked_authors[idx] == candidates.author_ids
+        affinity = np.where(matched, np.log1p(liked_counts[idx]), 0.0)
+
+    return (
+        weights.recency * recency
+        + weights.likes * np.log1p(candidates.likes)
+        + weights.comments * np.log1p(candidates.comments)
+        + weights.following * following
+        + weights.liked_author * affinity
+        + weights.media * candidates.has_media
+    )
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    best = np.argpartition(-scores, k)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        # SQLite hands back naive UTC timestamps
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class RankingService:
+    def __init__(self, db: Session, weights: Optional[RankingWeights] = None):
+        self.db = db
+        self.weights = weights or RankingWeights(**settings.FEED_RANK_WEIGHTS)
+
+    def candidates(self, limit: int) -> FeedCandidates:
+        rows = self.db.query(
+            Post.id, Post.author_id, Post.created_at, Post.image_url, Post.likes_count
+        ).filter(Post.is_active == True).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit).all()
+
+        post_ids = [row.id for row in rows]
+        likes = LikeCounter(self.db).counts(rows)
+        comments = PostService(self.db).comment_counts(post_ids)
+
+        return FeedCandidates(
+            post_ids=np.array(post_ids, dtype=np.int64),
+            author_ids=np.array([row.author_id for row in rows], dtype=np.int64),
+            created_at=np.array([_epoch(row.created_at) for row in rows], dtype=np.float64),
+            likes=np.array([likes.get(post_id, 0) for post_id in post_ids], dtype=np.float64),
+            comments=np.array([comments.get(post_id, 0) for post_id in post_ids], dtype=np.float64),
+            has_media=np.array([bool(row.image_url) for row in rows], dtype=np.float64)
+        )
+
+    def affinity(self, user_id: int):
+        followed = self.db.query(Follow.following_id).filter(Follow.follower_id == user_id).all()
+        liked = self.db.query(Post.author_id, func.count(Like.id)).join(
+            Post, Post.id == Like.post_id
+        ).filter(Like.user_id == user_id).group_by(Post.author_id).order_by(Post.author_id).all()
+
+        followed_authors = np.array([row[0] for row in followed], dtype=np.int64)
+        liked_authors = np.array([row[0] for row in liked], dtype=np.int64)
+        liked_counts = np.array([row[1] for row in liked], dtype=np.float64)
+        return followed_authors, liked_authors, liked_counts
+
+    def ranked_post_ids(self, user_id: int, k: int) -> List[int]:
+        candidates = self.candidates(settings.FEED_RANK_CANDIDATES)
+        if not len(candidates.post_ids):
+            return []
+        scores = score_candidates(
+            candidates,
+            *self.affinity(user_id),
+            weights=self.weights,
+            now=datetime.now(timezone.utc).timestamp()
+        )
+        return candidates.post_ids[top_k(scores, k)].tolist()
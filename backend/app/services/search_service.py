@@ -0,0 +1,123 @@
+import html
+import re
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload
+from ..models.post import Post
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+HIGHLIGHT = ("<mark>", "</mark>")
+# Private-use characters the database puts around matches; the snippet is
+# HTML-escaped before they are swapped for HIGHLIGHT
+MARKERS = ("\ue000", "\ue001")
+SNIPPET_WORDS = 16
+
+_index_ready: Dict[str, bool] = {}  # database URL -> full-text index exists
+
+def highlight(snippet: str) -> str:
+    """Escape post text for HTML and turn the match markers into <mark> tags"""
+    escaped = html.escape(snippet)
+    return escaped.replace(MARKERS[0], HIGHLIGHT[0]).replace(MARKERS[1], HIGHLIGHT[1])
+
+def search_backend(bind) -> Optional[str]:
+    """'fts5' on SQLite, 'tsvector' on Postgres, None where only LIKE scans are available"""
+    return {"sqlite": "fts5", "postgresql": "tsvector"}.get(bind.dialect.name)
+
+def ensure_search_index(engine: Engine):
+    """Create the full-text index for posts if it is missing, and fill it from existing rows.
+
+    SQLite keeps a separate FTS5 table keyed by post id that the write paths
+    maintain through SearchService. Postgres gets a generated tsvector column
+    with a GIN index, which the database keeps current by itself.
+    """
+    backend = search_backend(engine)
+    with engine.begin() as conn:
+        if backend == "fts5":
+            exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'")).first()
+            if not exists:
+                conn.execute(text("CREATE VIRTUAL TABLE posts_fts USING fts5(content, tokenize = 'unicode61 remove_diacritics 2')"))
+                conn.execute(text("INSERT INTO posts_fts (rowid, content) SELECT id, content FROM posts WHERE is_active"))
+        elif backend == "tsvector":
+            conn.execute(text(
+                "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(content, ''))) STORED"
+            ))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING GIN (search_vector)"))
+    if backend:
+        _index_ready[str(engine.url)] = True
+
+def search_index_ready(db: Session, backend: Optional[str]) -> bool:
+    """Whether ensure_search_index has created the index; checked once per database.
+
+    Without it (SQLite built without FTS5, a failed startup) post writes skip
+    indexing and search falls back to LIKE scans.
+    """
+    if not backend:
+        return False
+    key = str(db.get_bind().url)
+    if key not in _index_ready:
+        if backend == "fts5":
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        else:
+            query = "SELECT 1 FROM information_schema.columns WHERE table_name = 'posts' AND column_name = 'search_vector'"
+        _index_ready[key] = db.execute(text(query)).first() is not None
+    return _index_ready[key]
+
+class SearchService:
+    """Ranked full-text search over post content.
+
+    Every query term must match, and the last one also matches as a prefix so
+    results keep up while the user is typing. Callers own the transaction for
+    the index_post/remove_post calls, like they do for hashtags.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        backend = search_backend(db.get_bind())
+        self.backend = backend if search_index_ready(db, backend) else None
+
+    def index_post(self, post_id: int, content: str):
+        if self.backend == "fts5":
+            self.db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post_id})
+            self.db.execute(text("INSERT INTO posts_fts (rowid, content) VALUES (:id, :content)"), {"id": post_id, "content": content})
+
+    def remove_post(self, post_id: int):
+        if self.backend == "fts5":
+            self.db.execute(text("DELETE FROM posts_fts WHERE rowid = :id"), {"id": post_id})
+
+    def search_posts(self, q: str, limit: int) -> List[Tuple[Post, str]]:
+        """Best matches first, each with an HTML-escaped snippet of the matching text
+        with matches wrapped in <mark>"""
+        tokens = [token.lower() for token in TOKEN_PATTERN.findall(q)]
+        if not tokens:
+            return []
+
+        if self.backend == "fts5":
+            # Quoting every term keeps FTS5 operators in user input from being parsed
+            match = " ".join(f'"{token}"' for token in tokens) + "*"
+            rows = self.db.execute(text(
+                "SELECT rowid, snippet(posts_fts, 0, :start, :stop, '…', :words) FROM posts_fts "
+                "WHERE posts_fts MATCH :match ORDER BY bm25(posts_fts) LIMIT :limit"
+            ), {"start": MARKERS[0], "stop": MARKERS[1], "words": SNIPPET_WORDS, "match": match, "limit": limit}).all()
+        elif self.backend == "tsvector":
+            match = " & ".join(tokens) + ":*"
+            rows = self.db.execute(text(
+                "SELECT id, ts_headline('simple', content, query, :options) FROM posts, to_tsquery('simple', :match) query "
+                "WHERE is_active AND search_vector @@ query ORDER BY ts_rank(search_vector, query) DESC, id DESC LIMIT :limit"
+            ), {
+                "options": f"StartSel={MARKERS[0]}, StopSel={MARKERS[1]}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+                "match": match,
+                "limit": limit
+            }).all()
+        else:
+            posts = self.db.query(Post).options(joinedload(Post.author)).filter(
+                Post.is_active == True, Post.content.ilike(f"%{q}%")
+            ).order_by(Post.created_at.desc()).limit(limit).all()
+            return [(post, html.escape(post.content)) for post in posts]
+
+        snippets = {post_id: highlight(snippet) for post_id, snippet in rows}
+        posts = {post.id: post for post in self.db.query(Post).options(joinedload(Post.author)).filter(
+            Post.id.in_(snippets), Post.is_active == True
+        ).all()}
+        return [(posts[post_id], snippet) for post_id, snippet in snippets.items() if post_id in posts]
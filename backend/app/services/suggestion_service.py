@@ -0,0 +1,172 @@
+import asyncio
+from typing import Dict, FrozenSet, Iterable, List, Optional
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.jobs import claim_run
+from ..core.redis_client import redis_client
+from ..models.follow import Follow
+from ..models.user_profile import UserProfile
+from .ranking_service import top_k
+from .follow_graph import follow_graph, gather
+
+SUGGESTIONS_PER_USER = 50
+CANDIDATES_PER_USER = 200  # best friends-of-friends by mutual count, before interests are scored
+INTEREST_WEIGHT = 0.5  # one shared interest is worth half a mutual follow
+INTEREST_FANOUT = 200  # users taken per interest when looking for interest-only candidates
+POPULAR_USERS = 100
+INTEREST_FIELDS = ("hobbies", "skills", "clubs_societies", "study_groups", "interest_tags")
+
+def suggestions_key(user_id: int) -> str:
+    return f"suggestions:{user_id}"
+
+def normalize_interests(profile) -> FrozenSet[str]:
+    interests = set()
+    for field in INTEREST_FIELDS:
+        for value in getattr(profile, field) or []:
+            if isinstance(value, str) and value.strip("# "):
+                interests.add(value.strip("# ").lower())
+    return frozenset(interests)
+
+def rank_candidates(
+    user_id: int,
+    mutuals: Dict[int, int],
+    followed: Iterable[int],
+    interests: Dict[int, FrozenSet[str]],
+    extra: Iterable[int] = ()
+) -> List[List[int]]:
+    """[[candidate id, mutual follows, shared interests], ...], best first.
+
+    Candidates are the friends-of-friends in `mutuals` plus any `extra` ids
+    (users sharing an interest, popular users), minus the user and the people
+    they already follow.
+    """
+    excluded = set(followed)
+    excluded.add(user_id)
+    mine = interests.get(user_id, frozenset())
+    # Ties keep the order of `extra`, so popular users stay ordered by follower count
+    order = {}
+    for position, candidate in enumerate(extra):
+        order.setdefault(candidate, position)
+    scored = []
+    for candidate in set(mutuals) | set(order):
+        if candidate in excluded:
+            continue
+        mutual = mutuals.get(candidate, 0)
+        shared = len(mine & interests.get(candidate, frozenset()))
+        scored.append((-(mutual + INTEREST_WEIGHT * shared), order.get(candidate, len(order)), candidate, mutual, shared))
+    scored.sort()
+    return [[candidate, mutual, shared] for _, _, candidate, mutual, shared in scored[:SUGGESTIONS_PER_USER]]
+
+class SuggestionService:
+    """Who-to-follow lists: friends-of-friends ranked by mutual follows and shared interests.
+
+    A periodic batch job, run by one worker per round, computes every user's
+    list from the whole follows table and stores it in Redis; users missing from the cache (new accounts,
+    Redis restarts) get theirs computed with a few queries on first request.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def interests(self, user_ids: Optional[Iterable[int]] = None) -> Dict[int, FrozenSet[str]]:
+        query = self.db.query(UserProfile)
+        if user_ids is not None:
+            query = query.filter(UserProfile.user_id.in_(list(user_ids)))
+        return {profile.user_id: normalize_interests(profile) for profile in query.yield_per(5_000)}
+
+    def cached(self, user_id: int) -> Optional[List[List[int]]]:
+        return redis_client.get(suggestions_key(user_id))
+
+    def for_user(self, user_id: int) -> List[List[int]]:
+        """Cached list, or one computed from the database for this user alone"""
+        cached = self.cached(user_id)
+        if cached is not None:
+            return cached
+
+        if follow_graph.ready:
+            followed = follow_graph.following_ids(user_id).tolist()
+            candidates, counts = follow_graph.two_hop(user_id)
+            best = top_k(counts.astype(np.float64), CANDIDATES_PER_USER)
+            mutuals = dict(zip(candidates[best].tolist(), counts[best].tolist()))
+            popular = follow_graph.most_followed(POPULAR_USERS)
+        else:
+            followed = [row[0] for row in self.db.query(Follow.following_id).filter(Follow.follower_id == user_id).all()]
+            first, second = aliased(Follow), aliased(Follow)
+            mutuals = dict(self.db.query(second.following_id, func.count()).select_from(first).join(
+                second, second.follower_id == first.following_id
+            ).filter(first.follower_id == user_id).group_by(second.following_id).order_by(
+                func.count().desc()
+            ).limit(CANDIDATES_PER_USER + len(followed) + 1).all())
+            popular = [row[0] for row in self.db.query(Follow.following_id).group_by(Follow.following_id).order_by(
+                func.count().desc()
+            ).limit(POPULAR_USERS).all()]
+
+        interests = self.interests(set(mutuals) | set(popular) | {user_id})
+        suggestions = rank_candidates(user_id, mutuals, followed, interests, popular)
+        redis_client.set(suggestions_key(user_id), suggestions, expire=settings.SUGGESTIONS_REFRESH_SECONDS * 2)
+        return suggestions
+
+    def compute_all(self) -> int:
+        """Recompute and cache every user's suggestions from one pass over the follow graph"""
+        if follow_graph.ready:
+            follow_graph.compact()
+            indptr, following = follow_graph.csr()
+        else:
+            # CSR adjacency of who each user follows, indexed directly by user id
+            edges = np.array(self.db.query(Follow.follower_id, Follow.following_id).all(), dtype=np.int64).reshape(-1, 2)
+            edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(edges[:, 0]))))
+            following = edges[:, 1]
+        interests = self.interests()
+        if not len(following) and not interests:
+            return 0
+
+        size = max(len(indptr) - 1, int(following.max(initial=0)) + 1, max(interests, default=0) + 1)
+        indptr = np.concatenate((indptr, np.full(size + 1 - len(indptr), indptr[-1])))
+        follower_counts = np.bincount(following, minlength=size)
+        popular = [user_id for user_id in top_k(follower_counts.astype(np.float64), POPULAR_USERS).tolist() if follower_counts[user_id]]
+
+        by_interest: Dict[str, List[int]] = {}
+        for user_id, names in interests.items():
+            for name in names:
+                members = by_interest.setdefault(name, [])
+                if len(members) < INTEREST_FANOUT:
+                    members.append(user_id)
+
+        expire = settings.SUGGESTIONS_REFRESH_SECONDS * 2
+        batch, computed = {}, 0
+        for user_id in set(np.flatnonzero(np.diff(indptr)).tolist()) | set(interests):
+            followed = following[indptr[user_id]:indptr[user_id + 1]]
+            candidates, counts = np.unique(gather(indptr, following, followed), return_counts=True)
+            best = top_k(counts.astype(np.float64), CANDIDATES_PER_USER + len(followed) + 1)
+            mutuals = dict(zip(candidates[best].tolist(), counts[best].tolist()))
+            extra = [member for name in interests.get(user_id, ()) for member in by_interest[name]]
+
+            batch[suggestions_key(user_id)] = rank_candidates(user_id, mutuals, followed.tolist(), interests, extra + popular)
+            computed += 1
+            if len(batch) >= 1_000:
+                redis_client.set_many(batch, expire=expire)
+                batch = {}
+        if batch:
+            redis_client.set_many(batch, expire=expire)
+        return computed
+
+def compute_suggestions():
+    db = SessionLocal()
+    try:
+        return SuggestionService(db).compute_all()
+    finally:
+        db.close()
+
+async def run_suggestions_loop(interval: int):
+    while True:
+        try:
+            if claim_run("suggestions", interval):
+                await run_in_threadpool(compute_suggestions)
+        except Exception as e:
+            print(f"Suggestion batch failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,99 @@
+from typing import Iterable, List, Optional
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.redis_client import redis_client
+from ..models.post import Post
+from ..models.follow import Follow
+
+CELEBRITIES_KEY = "timeline:celebrities"
+
+def timeline_key(user_id: int) -> str:
+    return f"timeline:{user_id}"
+
+class TimelineService:
+    """Home timelines kept as per-user Redis sorted sets of post ids (score = post id).
+
+    Posts are pushed to every follower when created. Authors with more than
+    TIMELINE_FANOUT_LIMIT followers are recorded in a shared set instead and
+    their posts are merged in when a follower reads the timeline.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def following_ids(self, user_id: int) -> List[int]:
+        rows = self.db.query(Follow.following_id).filter(Follow.follower_id == user_id).all()
+        return [row[0] for row in rows]
+
+    def recent_post_ids(self, author_ids: Iterable[int], before: Optional[int], limit: int) -> List[int]:
+        author_ids = list(author_ids)
+        if not author_ids:
+            return []
+        query = self.db.query(Post.id).filter(Post.author_id.in_(author_ids), Post.is_active == True)
+        if before is not None:
+            query = query.filter(Post.id < before)
+        return [row[0] for row in query.order_by(Post.id.desc()).limit(limit).all()]
+
+    def fan_out(self, post: Post):
+        """Push a new post onto the author's and their followers' timelines"""
+        limit = settings.TIMELINE_FANOUT_LIMIT
+        rows = self.db.query(Follow.follower_id).filter(Follow.following_id == post.author_id).limit(limit + 1).all()
+        keys = [timeline_key(post.author_id)]
+        if len(rows) > limit:
+            redis_client.sadd(CELEBRITIES_KEY, str(post.author_id))
+        else:
+            keys.extend(timeline_key(row[0]) for row in rows)
+        # Timelines that were never built are filled from the database on first read
+        keys = redis_client.existing(keys)
+        if keys:
+            redis_client.zadd_many(keys, {str(post.id): post.id}, max_len=settings.TIMELINE_MAX_LENGTH)
+
+    def rebuild(self, user_id: int):
+        """Recompute one user's timeline from the follows and posts tables"""
+        celebrities = self._celebrities()
+        authors = [author_id for author_id in self.following_ids(user_id) if author_id not in celebrities]
+        authors.append(user_id)
+        post_ids = self.recent_post_ids(authors, None, settings.TIMELINE_MAX_LENGTH)
+        key = timeline_key(user_id)
+        redis_client.delete(key)
+        if post_ids:
+            redis_client.zadd_many([key], {str(post_id): post_id for post_id in post_ids})
+
+    def add_author(self, user_id: int, author_id: int):
+        """Merge a newly followed author's recent posts into the follower's timeline"""
+        if author_id in self._celebrities() or not redis_client.exists(timeline_key(user_id)):
+            return
+        post_ids = self.recent_post_ids([author_id], None, settings.TIMELINE_MAX_LENGTH)
+        if post_ids:
+            redis_client.zadd_many(
+                [timeline_key(user_id)],
+                {str(post_id): post_id for post_id in post_ids},
+                max_len=settings.TIMELINE_MAX_LENGTH
+            )
+
+    def remove_author(self, user_id: int, author_id: int):
+        post_ids = self.recent_post_ids([author_id], None, settings.TIMELINE_MAX_LENGTH)
+        redis_client.zrem(timeline_key(user_id), *[str(post_id) for post_id in post_ids])
+
+    def read(self, user_id: int, before: Optional[int], limit: int) -> List[int]:
+        """Post ids for one page of the home timeline, newest first, strictly below `before`"""
+        key = timeline_key(user_id)
+        cached = redis_client.zrevrange_below(key, before, limit)
+        if cached is None:
+            # Redis is unavailable: build the page from the database
+            return self.recent_post_ids(self.following_ids(user_id) + [user_id], before, limit)
+        if not cached and before is None and not redis_client.exists(key):
+            # Never built or evicted
+            self.rebuild(user_id)
+            cached = redis_client.zrevrange_below(key, before, limit) or []
+
+        post_ids = {int(post_id) for post_id in cached}
+        celebrities = self._celebrities()
+        if celebrities:
+            followed = [author_id for author_id in self.following_ids(user_id) if author_id in celebrities]
+            post_ids.update(self.recent_post_ids(followed, before, limit))
+        return sorted(post_ids, reverse=True)[:limit]
+
+    def _celebrities(self) -> set:
+        members = redis_client.smembers(CELEBRITIES_KEY) or set()
+        return {int(member) for member in members}
@@ -0,0 +1,108 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.post import Post
+from ..models.hashtag import Hashtag, post_hashtags
+
+# name -> (bucket length in seconds, number of buckets)
+WINDOWS = {
+    "1h": (300, 12),
+    "24h": (3600, 24),
+}
+SKETCH_CAPACITY = 256  # tags tracked per bucket
+MERGED_CAPACITY = 100  # tags kept in a window's cached ranking
+CACHE_SECONDS = 15
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters summary: at most `capacity` counters.
+
+    When full, a new item replaces the smallest counter and inherits its
+    count, so every tag with true frequency above n / capacity is kept and
+    counts are overestimated by at most that minimum.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1):
+        if item in self.counts or len(self.counts) < self.capacity:
+            self.counts[item] = self.counts.get(item, 0) + count
+            return
+        smallest = min(self.counts, key=self.counts.get)
+        self.counts[item] = self.counts.pop(smallest) + count
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:k]
+
+class SlidingWindow:
+    """Ring of time buckets, each with its own sketch; expired buckets are reset in place"""
+
+    def __init__(self, bucket_seconds: int, buckets: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets: List[Tuple[int, SpaceSaving]] = [(-1, SpaceSaving(SKETCH_CAPACITY)) for _ in range(buckets)]
+        self.ranking: List[Tuple[str, int]] = []
+        self.ranked_at = 0.0
+        self.ranked_bucket = -1
+
+    def add(self, tag: str, at: float):
+        index = int(at // self.bucket_seconds)
+        current = int(time.time() // self.bucket_seconds)
+        if index <= current - len(self.buckets):
+            return
+        slot = index % len(self.buckets)
+        bucket_index, sketch = self.buckets[slot]
+        if bucket_index != index:
+            sketch = SpaceSaving(SKETCH_CAPACITY)
+            self.buckets[slot] = (index, sketch)
+        sketch.add(tag)
+
+    def top(self, k: int, now: float) -> List[Tuple[str, int]]:
+        current = int(now // self.bucket_seconds)
+        if current != self.ranked_bucket or now - self.ranked_at > CACHE_SECONDS:
+            totals: Dict[str, int] = {}
+            for index, sketch in self.buckets:
+                if current - len(self.buckets) < index <= current:
+                    for tag, count in sketch.counts.items():
+                        totals[tag] = totals.get(tag, 0) + count
+            self.ranking = sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))[:MERGED_CAPACITY]
+            self.ranked_at, self.ranked_bucket = now, current
+        # The ranking is cached per window, so a request only slices it
+        return self.ranking[:k]
+
+class TrendingEngine:
+    """Hashtag counts over sliding windows, fed by post creation, in bounded memory"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = {name: SlidingWindow(*shape) for name, shape in WINDOWS.items()}
+
+    def record(self, tags: Iterable[str], at: Optional[float] = None):
+        at = at if at is not None else time.time()
+        with self.lock:
+            for tag in tags:
+                for window in self.windows.values():
+                    window.add(tag, at)
+
+    def top(self, window: str, k: int) -> List[Tuple[str, int]]:
+        with self.lock:
+            return self.windows[window].top(k, time.time())
+
+    def warm(self, db: Session):
+        """Replay the last day of tagged posts, e.g. after a restart"""
+        horizon = max(seconds * buckets for seconds, buckets in WINDOWS.values())
+        since = datetime.now(timezone.utc) - timedelta(seconds=horizon)
+        rows = db.query(Hashtag.name, Post.created_at).join(
+            post_hashtags, post_hashtags.c.hashtag_id == Hashtag.id
+        ).join(Post, Post.id == post_hashtags.c.post_id).filter(
+            Post.is_active == True, Post.created_at >= since.replace(tzinfo=None)
+        ).all()
+        for name, created_at in rows:
+            if created_at.tzinfo is None:
+                # SQLite hands back naive UTC timestamps
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            self.record([name], created_at.timestamp())
+
+trending_engine = TrendingEngine()
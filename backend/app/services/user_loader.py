@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, List, Optional
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..models.user import User
+
+MAX_BATCH = 100  # ids accepted by GET /users/batch
+
+def user_card(user: User) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "full_name": user.full_name,
+        "profile_photo": user.profile_photo,
+        "is_verified": user.is_verified
+    }
+
+class UserLoader:
+    """Batches and dedupes user lookups for the length of one request.
+
+    Code that will need users later queues their ids with `want`; the first
+    read then loads everything queued in a single IN query. Users already
+    loaded (or known to be missing) are never queried again, so authors that
+    repeat across a comment thread or partners across an inbox cost one row
+    each.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.users: Dict[int, Optional[User]] = {}
+        self.pending = set()
+
+    def want(self, user_ids: Iterable[int]):
+        self.pending.update(user_id for user_id in user_ids if user_id not in self.users)
+
+    def load_many(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        user_ids = list(user_ids)
+        self.want(user_ids)
+        if self.pending:
+            for user in self.db.query(User).filter(User.id.in_(self.pending)).all():
+                self.users[user.id] = user
+            for user_id in self.pending:
+                self.users.setdefault(user_id, None)
+            self.pending = set()
+        return {user_id: self.users[user_id] for user_id in user_ids if self.users[user_id] is not None}
+
+    def get(self, user_id: int) -> Optional[User]:
+        return self.load_many([user_id]).get(user_id)
+
+    def cards(self, user_ids: Iterable[int]) -> List[dict]:
+        """Compact cards in the order given, skipping unknown ids and repeats"""
+        user_ids = list(dict.fromkeys(user_ids))
+        users = self.load_many(user_ids)
+        return [user_card(users[user_id]) for user_id in user_ids if user_id in users]
+
+def get_user_loader(db: Session = Depends(get_db)) -> UserLoader:
+    # FastAPI caches dependencies per request, so every route and dependency
+    # asking for a loader in the same request shares this one
+    return UserLoader(db)
@@ -0,0 +1,209 @@
+import asyncio
+import re
+import threading
+from array import array
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.database import SessionLocal
+from ..models.user import User
+from .ranking_service import top_k
+
+WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+SIMILARITY_THRESHOLD = 0.3  # same default as pg_trgm
+CANDIDATE_BUDGET = 50_000  # postings merged to find candidates per query
+COMPACT_RATIO = 0.5  # compact once this share of slots is dead
+LOAD_BATCH = 10_000
+# Transactions commit after the updated_at they wrote, so each refresh re-reads a margin
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """pg_trgm-style trigrams: words lower-cased and padded with two leading and one trailing space"""
+    grams = set()
+    for word in WORD_PATTERN.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class TrigramIndex:
+    """Fuzzy, typo-tolerant lookup of users by username and full name.
+
+    Each indexed name gets a slot number; a posting list per trigram holds
+    the slots containing it as a packed int32 array, appended in ascending
+    order. A profile change kills the user's old slots and appends new ones,
+    and dead slots are squeezed out once they make up half the index.
+    Results are ranked by trigram similarity, |shared| / |union|.
+
+    Ranking is exact for every name sharing one of the query's rarer
+    trigrams. Names that only share trigrams so common that their posting
+    lists exceed the candidate budget are weak matches anyway, and leaving
+    them out keeps the cost of a query bounded at any index size.
+
+    Register and profile updates upsert into the index of the worker that
+    served them; refresh() applies everyone else's from users.updated_at.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings: Dict[str, array] = {}
+        self.slot_users = array("i")  # slot -> user id
+        self.slot_sizes = array("H")  # slot -> number of distinct trigrams
+        self.alive = bytearray()  # slot -> 1 while current
+        self.user_slots: Dict[int, List[int]] = {}
+        self.dead = 0
+        self.ready = False
+        self.since = None  # database time the last load or refresh started
+
+    def __len__(self):
+        return len(self.user_slots)
+
+    def _add(self, user_id: int, names: Tuple[Optional[str], ...]):
+        slots = []
+        for name in names:
+            grams = trigrams(name)
+            if not grams:
+                continue
+            slot = len(self.slot_users)
+            self.slot_users.append(user_id)
+            self.slot_sizes.append(min(len(grams), 0xFFFF))
+            self.alive.append(1)
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("i")
+                posting.append(slot)
+            slots.append(slot)
+        self.user_slots[user_id] = slots
+
+    def _remove(self, user_id: int):
+        for slot in self.user_slots.pop(user_id, []):
+            self.alive[slot] = 0
+            self.dead += 1
+
+    def upsert(self, user_id: int, username: Optional[str], full_name: Optional[str]):
+        with self.lock:
+            self._remove(user_id)
+            self._add(user_id, (username, full_name))
+            if self.dead > len(self.slot_users) * COMPACT_RATIO:
+                self._compact()
+
+    def remove(self, user_id: int):
+        with self.lock:
+            self._remove(user_id)
+
+    def _compact(self):
+        """Drop dead slots from every posting list and renumber the survivors"""
+        alive = np.frombuffer(bytes(self.alive), dtype=np.uint8).astype(bool)
+        renumber = np.cumsum(alive, dtype=np.int64) - 1
+        for gram, posting in list(self.postings.items()):
+            slots = np.array(posting, dtype=np.int32)
+            slots = renumber[slots[alive[slots]]].astype(np.int32)
+            if len(slots):
+                self.postings[gram] = array("i", slots.tobytes())
+            else:
+                del self.postings[gram]
+        self.slot_users = array("i", np.array(self.slot_users, dtype=np.int32)[alive].tobytes())
+        self.slot_sizes = array("H", np.array(self.slot_sizes, dtype=np.uint16)[alive].tobytes())
+        self.alive = bytearray(b"\x01" * len(self.slot_users))
+        self.user_slots = {}
+        for slot, user_id in enumerate(self.slot_users):
+            self.user_slots.setdefault(user_id, []).append(slot)
+        self.dead = 0
+
+    def search(self, q: str, k: int, threshold: float = SIMILARITY_THRESHOLD) -> List[Tuple[int, float]]:
+        """Up to k (user id, similarity) pairs, most similar first"""
+        grams = trigrams(q)
+        if not grams:
+            return []
+        with self.lock:
+            lists = sorted(
+                (np.frombuffer(self.postings[gram], dtype=np.int32) for gram in grams if gram in self.postings), key=len
+            )
+            if not lists:
+                return []
+            # Candidates come from the rarest trigrams, up to a budget; the common
+            # ones are only probed for those candidates, with a binary search each
+            pool, used = [lists[0][:CANDIDATE_BUDGET]], len(lists[0])
+            while len(pool) < len(lists) and used + len(lists[len(pool)]) <= CANDIDATE_BUDGET:
+                used += len(lists[len(pool)])
+                pool.append(lists[len(pool)])
+            slots, shared = np.unique(np.concatenate(pool), return_counts=True)
+            for posting in lists[len(pool):]:
+                found = np.minimum(np.searchsorted(posting, slots), len(posting) - 1)
+                shared += posting[found] == slots
+            del lists, pool
+            # similarity <= shared / len(grams), so weak candidates are dropped before any lookups
+            strong = shared >= threshold * len(grams)
+            slots, shared = slots[strong], shared[strong]
+            # Views on the live arrays; fancy indexing copies out before the lock is released
+            sizes = np.frombuffer(self.slot_sizes, dtype=np.uint16)[slots].astype(np.int32)
+            alive = np.frombuffer(self.alive, dtype=np.uint8)[slots].astype(bool)
+            users = np.frombuffer(self.slot_users, dtype=np.int32)[slots]
+
+        similarity = shared / (len(grams) + sizes - shared)
+        keep = alive & (similarity >= threshold)
+        similarity, users = similarity[keep], users[keep]
+        # A user can match on both names, so look a little past k before de-duplicating
+        results, seen = [], set()
+        for i in top_k(similarity, 2 * k):
+            user_id = int(users[i])
+            if user_id not in seen:
+                seen.add(user_id)
+                results.append((user_id, float(similarity[i])))
+                if len(results) == k:
+                    break
+        return results
+
+    def load(self, db: Session):
+        """Build the index from the users table, replacing whatever it held"""
+        started = db.query(func.now()).scalar()
+        fresh = TrigramIndex()
+        last_id = 0
+        while True:
+            rows = db.query(User.id, User.username, User.full_name).filter(
+                User.id > last_id
+            ).order_by(User.id).limit(LOAD_BATCH).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            for row in rows:
+                fresh._add(row.id, (row.username, row.full_name))
+        with self.lock:
+            self.postings, self.slot_users, self.slot_sizes = fresh.postings, fresh.slot_users, fresh.slot_sizes
+            self.alive, self.user_slots, self.dead = fresh.alive, fresh.user_slots, 0
+            self.since = started
+            self.ready = True
+
+    def refresh(self, db: Session) -> int:
+        """Upsert users registered or edited since the last load or refresh,
+        on any worker; one range of ix_users_updated_at"""
+        if not self.ready:
+            return 0
+        started = db.query(func.now()).scalar()
+        rows = db.query(User.id, User.username, User.full_name).filter(
+            User.updated_at >= self.since - REFRESH_OVERLAP
+        ).all()
+        for row in rows:
+            self.upsert(row.id, row.username, row.full_name)
+        self.since = started
+        return len(rows)
+
+user_index = TrigramIndex()
+
+def refresh_user_index():
+    db = SessionLocal()
+    try:
+        user_index.refresh(db)
+    finally:
+        db.close()
+
+async def run_user_index_refresh_loop(interval: int):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh_user_index)
+        except Exception as e:
+            print(f"User search index refresh failed: {e}")
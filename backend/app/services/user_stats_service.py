@@ -0,0 +1,114 @@
+import asyncio
+from typing import Dict, List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..core.database import SessionLocal
+from ..core.jobs import claim_run
+from ..core.versions import invalidate_user
+from ..models.user import User
+from ..models.post import Post
+from ..models.follow import Follow
+from ..models.user_stats import UserStats
+
+COUNTERS = ("posts_count", "followers_count", "following_count")
+
+def actual_counts(user_id):
+    """Correlated subqueries recomputing each counter for the given user id column"""
+    return {
+        "posts_count": select(func.count(Post.id)).where(Post.author_id == user_id, Post.is_active == True).scalar_subquery(),
+        "followers_count": select(func.count(Follow.id)).where(Follow.following_id == user_id).scalar_subquery(),
+        "following_count": select(func.count(Follow.id)).where(Follow.follower_id == user_id).scalar_subquery()
+    }
+
+class UserStatsService:
+    """Reads and maintains user_stats.
+
+    Writers call bump() inside their own transaction, next to the row they
+    add or remove, so the counters commit or roll back with it. Users without
+    a row yet get one built from the source tables on their first bump or by
+    the reconcile job; until then reads count the source tables directly.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure(self, user_ids: List[int]):
+        """Create missing rows from the source tables; existing rows are left alone"""
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        counts = actual_counts(User.id)
+        rows = select(User.id, *(counts[name] for name in COUNTERS)).where(User.id.in_(user_ids))
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            module = postgresql if dialect == "postgresql" else sqlite
+            statement = module.insert(UserStats).from_select(["user_id", *COUNTERS], rows).on_conflict_do_nothing(
+                index_elements=["user_id"]
+            )
+        else:
+            existing = select(UserStats.user_id)
+            statement = insert(UserStats).from_select(["user_id", *COUNTERS], rows.where(User.id.not_in(existing)))
+        self.db.execute(statement)
+
+    def bump(self, user_id: int, **deltas: int):
+        """Add deltas to a user's counters, e.g. bump(user_id, posts_count=1)"""
+        result = self.db.execute(
+            update(UserStats).where(UserStats.user_id == user_id).values(
+                {name: getattr(UserStats, name) + delta for name, delta in deltas.items()}
+            )
+        )
+        if not result.rowcount:
+            # First change for this user: build the row from the tables, which already
+            # include the caller's flushed change
+            self.db.flush()
+            self.ensure([user_id])
+
+    def get(self, user_id: int) -> Dict[str, int]:
+        row = self.db.query(UserStats).filter(UserStats.user_id == user_id).first()
+        if row is None:
+            # Reads never write: count this once, reconcile() creates the row
+            counts = actual_counts(user_id)
+            row = self.db.execute(select(*(counts[name].label(name) for name in COUNTERS))).one()
+        return {name: getattr(row, name) for name in COUNTERS}
+
+    def reconcile(self) -> List[int]:
+        """Create missing rows and repair drifted ones; returns the repaired user ids"""
+        missing = [row[0] for row in self.db.query(User.id).outerjoin(
+            UserStats, UserStats.user_id == User.id
+        ).filter(UserStats.user_id.is_(None)).all()]
+        self.ensure(missing)
+
+        actual = actual_counts(UserStats.user_id)
+        drifted = [row[0] for row in self.db.query(UserStats.user_id).filter(
+            (UserStats.posts_count != actual["posts_count"])
+            | (UserStats.followers_count != actual["followers_count"])
+            | (UserStats.following_count != actual["following_count"])
+        ).all()]
+        if drifted:
+            # Recomputed inside the UPDATE itself, so concurrent bumps are not overwritten with stale values
+            self.db.execute(
+                update(UserStats).where(UserStats.user_id.in_(drifted)).values(actual),
+                execution_options={"synchronize_session": False}
+            )
+        self.db.commit()
+        for user_id in drifted:
+            invalidate_user(user_id)
+        return drifted
+
+def reconcile_user_stats():
+    db = SessionLocal()
+    try:
+        return UserStatsService(db).reconcile()
+    finally:
+        db.close()
+
+async def run_stats_reconcile_loop(interval: int):
+    while True:
+        try:
+            if claim_run("stats_reconcile", interval):
+                await run_in_threadpool(reconcile_user_stats)
+        except Exception as e:
+            print(f"User stats reconciliation failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,14 @@
+from app.core.database import SessionLocal, engine, Base
+from app.models.message import Message
+from app.models.conversation import Conversation
+from app.services.conversation_service import ConversationService
+
+Base.metadata.create_all(bind=engine, tables=[Conversation.__table__])
+
+db = SessionLocal()
+# Rebuild the inbox read model from the full message history in one statement
+rows = ConversationService(db).rebuild()
+db.commit()
+
+print(f"Rebuilt {rows} conversation rows")
+db.close()
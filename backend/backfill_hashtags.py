@@ -0,0 +1,38 @@
+from sqlalchemy import delete, func, insert, select, update
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.post import Post
+from app.models.hashtag import Hashtag, post_hashtags
+from app.services.hashtag_service import HashtagService, extract_hashtags
+
+BATCH_SIZE = 1000
+
+db = SessionLocal()
+service = HashtagService(db)
+
+# Rebuild post_hashtags from the content of every active post
+db.execute(delete(post_hashtags))
+last_id = 0
+tagged = 0
+while True:
+    posts = db.query(Post.id, Post.content).filter(
+        Post.is_active == True, Post.id > last_id
+    ).order_by(Post.id).limit(BATCH_SIZE).all()
+    if not posts:
+        break
+    last_id = posts[-1].id
+
+    tags = {post.id: extract_hashtags(post.content) for post in posts}
+    ids = service.ensure(set().union(*tags.values()))
+    rows = [{"post_id": post_id, "hashtag_id": ids[name]} for post_id, names in tags.items() for name in names]
+    if rows:
+        db.execute(insert(post_hashtags), rows)
+    tagged += sum(1 for names in tags.values() if names)
+
+# Recompute usage_count from the association table in one statement
+usage = select(func.count()).where(post_hashtags.c.hashtag_id == Hashtag.id).scalar_subquery()
+db.execute(update(Hashtag).values(usage_count=usage), execution_options={"synchronize_session": False})
+db.commit()
+
+print(f"Indexed hashtags on {tagged} posts")
+db.close()
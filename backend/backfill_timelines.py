@@ -0,0 +1,15 @@
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.follow import Follow
+from app.services.timeline_service import TimelineService
+
+db = SessionLocal()
+service = TimelineService(db)
+
+# Every user who follows someone gets a timeline rebuilt from the follows table
+follower_ids = [row[0] for row in db.query(Follow.follower_id).distinct().all()]
+for user_id in follower_ids:
+    service.rebuild(user_id)
+
+print(f"Rebuilt {len(follower_ids)} home timelines")
+db.close()
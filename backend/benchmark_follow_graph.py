@@ -0,0 +1,45 @@
+import time
+import numpy as np
+from app.services.follow_graph import FollowGraph
+
+USERS = 1_000_000
+EDGES = 20_000_000
+QUERIES = 10_000
+
+rng = np.random.default_rng(42)
+# Popularity is heavy-tailed: a few accounts collect most of the follows
+followers = rng.integers(1, USERS + 1, EDGES)
+following = np.minimum((rng.pareto(1.2, EDGES) * 50).astype(np.int64) + 1, USERS)
+keep = followers != following
+pairs = np.unique((followers[keep] << 32) | following[keep])
+followers, following = pairs >> 32, pairs & 0xFFFFFFFF
+
+graph = FollowGraph()
+start = time.perf_counter()
+graph._build(followers, following)
+build_seconds = time.perf_counter() - start
+
+users = rng.integers(1, USERS + 1, QUERIES).tolist()
+others = rng.integers(1, USERS + 1, QUERIES).tolist()
+# Live changes that have not been compacted yet
+for a, b in zip(users[:1_000], others[:1_000]):
+    graph.add(a, b)
+
+def timed(name, fn):
+    start = time.perf_counter()
+    for a, b in zip(users, others):
+        fn(a, b)
+    print(f"  {name:<17} {(time.perf_counter() - start) / QUERIES * 1e6:8.1f} µs")
+
+print(f"Built {len(pairs)} follows over {USERS} users in {build_seconds:.1f} s")
+print(f"Per query, averaged over {QUERIES} random users:")
+timed("followers_count", lambda a, b: graph.followers_count(a))
+timed("follows", lambda a, b: graph.follows(a, b))
+timed("following_ids", lambda a, b: graph.following_ids(a))
+timed("mutuals", lambda a, b: graph.mutuals(a))
+timed("common_following", lambda a, b: graph.common_following(a, b))
+timed("two_hop", lambda a, b: graph.two_hop(a))
+
+start = time.perf_counter()
+graph.compact()
+print(f"Compaction: {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,68 @@
+import random
+import string
+import time
+from app.services.user_search import TrigramIndex, trigrams
+
+USERS = 1_000_000
+QUERIES = 200
+K = 10
+
+random.seed(42)
+FIRST = ["john", "mary", "peter", "grace", "james", "faith", "brian", "mercy", "kevin", "joy",
+         "dennis", "ann", "david", "esther", "samuel", "lucy", "daniel", "ruth", "paul", "sharon"]
+LAST = ["kamau", "wanjiru", "otieno", "achieng", "mwangi", "njeri", "kiprop", "chebet", "mutua", "wambui",
+        "omondi", "akinyi", "kariuki", "nyambura", "ochieng", "atieno", "kimani", "wairimu", "korir", "jepkosgei"]
+
+def make_user(user_id: int):
+    first, last = random.choice(FIRST), random.choice(LAST)
+    suffix = "".join(random.choices(string.ascii_lowercase + string.digits, k=random.randint(2, 6)))
+    return f"{first}_{last}{suffix}", f"{first.title()} {last.title()}"
+
+def typo(text: str) -> str:
+    """Drop, swap or replace one character"""
+    i = random.randrange(len(text) - 1)
+    kind = random.choice("drs")
+    if kind == "d":
+        return text[:i] + text[i + 1:]
+    if kind == "s":
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + random.choice(string.ascii_lowercase) + text[i + 1:]
+
+users = [make_user(user_id) for user_id in range(1, USERS + 1)]
+index = TrigramIndex()
+start = time.perf_counter()
+for user_id, (username, full_name) in enumerate(users, start=1):
+    index._add(user_id, (username, full_name))
+build_seconds = time.perf_counter() - start
+postings = sum(len(posting) for posting in index.postings.values())
+
+targets = random.sample(range(1, USERS + 1), QUERIES)
+queries = [typo(users[user_id - 1][0]) for user_id in targets]
+
+timings, hits = [], 0
+for user_id, query in zip(targets, queries):
+    start = time.perf_counter()
+    results = index.search(query, K)
+    timings.append((time.perf_counter() - start) * 1000)
+    hits += any(found == user_id for found, _ in results)
+timings.sort()
+
+def reference(query: str):
+    """Similarity against every name, for comparison only"""
+    grams = trigrams(query)
+    scored = []
+    for user_id, names in enumerate(users[:100_000], start=1):
+        best = max(len(grams & g) / len(grams | g) for g in map(trigrams, names))
+        scored.append((best, user_id))
+    return sorted(scored, reverse=True)[:K]
+
+start = time.perf_counter()
+reference(queries[0])
+scan_ms = (time.perf_counter() - start) * 1000 * USERS / 100_000
+
+print(f"Indexed {USERS} users in {build_seconds:.1f} s: {len(index.postings)} trigrams, {postings} postings ({postings * 4 / 2**20:.0f} MiB)")
+print(f"Misspelled username lookups, top {K}")
+print(f"  p50: {timings[len(timings) // 2]:.2f} ms")
+print(f"  p99: {timings[int(len(timings) * 0.99)]:.2f} ms")
+print(f"  target user in results: {hits}/{QUERIES}")
+print(f"  full scan estimate: {scan_ms:.0f} ms")
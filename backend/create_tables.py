@@ -5,6 +5,9 @@ from app.models.like import Like
 from app.models.follow import Follow
 from app.models.notification import Notification
 from app.models.story import Story
+from app.models.user_stats import UserStats
+from app.models.message import Message
+from app.models.conversation import Conversation
 
 # Create all tables
 Base.metadata.create_all(bind=engine)
@@ -0,0 +1,10 @@
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.services.like_counter import LikeCounter
+
+db = SessionLocal()
+
+# Flush buffered deltas, then repair posts.likes_count against the likes table
+repaired = LikeCounter(db).reconcile()
+print(f"Repaired like counts on {len(repaired)} posts")
+db.close()
@@ -0,0 +1,9 @@
+from app.core.database import SessionLocal
+from app.services.user_stats_service import UserStatsService
+
+db = SessionLocal()
+
+# Create missing user_stats rows and repair counters that drifted from posts and follows
+repaired = UserStatsService(db).reconcile()
+print(f"Repaired stats for {len(repaired)} users")
+db.close()
@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models.user import User
+from app.models.post import Post, Comment
+from app.models.like import Like
+from app.services.post_service import PostService
+
+def make_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[User.__table__, Post.__table__, Comment.__table__, Like.__table__])
+    return engine, sessionmaker(bind=engine)()
+
+def seed(db, users: int, posts_per_user: int):
+    authors = [User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x") for i in range(users)]
+    db.add_all(authors)
+    db.flush()
+    for author in authors:
+        for n in range(posts_per_user):
+            post = Post(content=f"post {n} by {author.username}", author_id=author.id, likes_count=n + 1)
+            db.add(post)
+            db.flush()
+            for liker in authors[:n + 1]:
+                db.add(Like(user_id=liker.id, post_id=post.id))
+            db.add(Comment(content="nice", post_id=post.id, author_id=author.id))
+    db.commit()
+
+def count_queries(engine, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+def test_feed_page_query_count_is_constant():
+    engine, db = make_session()
+    seed(db, users=10, posts_per_user=5)
+    service = PostService(db)
+
+    for limit in (1, 20, 50):
+        db.expire_all()
+        page, queries = count_queries(engine, lambda: service.hydrate(
+            service.active_posts().order_by(Post.created_at.desc(), Post.id.desc()).limit(limit).all()
+        ))
+        # Posts joined with authors, then one grouped comment count; likes come from the counter column
+        assert queries == 2
+        assert len(page) == limit
+        # Serializing the page must not trigger lazy loads
+        _, queries = count_queries(engine, lambda: [item["author"].username for item in page])
+        assert queries == 0
+
+def test_hydrated_counts_match_rows():
+    engine, db = make_session()
+    seed(db, users=3, posts_per_user=3)
+    service = PostService(db)
+
+    for item in service.hydrate(service.active_posts().all()):
+        assert item["likes_count"] == db.query(Like).filter(Like.post_id == item["id"]).count()
+        assert item["comments_count"] == 1
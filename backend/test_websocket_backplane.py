@@ -0,0 +1,147 @@
+import asyncio
+import json
+from app.core.backplane import Backplane
+from app.core.websocket_manager import NotificationManager
+from app.api.v1.websocket.chat import ConnectionManager as ChatManager
+from app.api.v1.websocket.routes import ConnectionManager as DirectManager
+
+class InMemoryBroker:
+    """Stand-in for Redis pub/sub: every subscription to a channel gets each message published on it"""
+
+    def __init__(self):
+        self.subscriptions = []
+
+    async def publish(self, channel, data):
+        for subscription in self.subscriptions:
+            if channel in subscription.channels:
+                subscription.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self):
+        return InMemoryPubSub(self)
+
+class InMemoryPubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = set()
+        self.queue = asyncio.Queue()
+        broker.subscriptions.append(self)
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        self.broker.subscriptions.remove(self)
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+class Worker:
+    """The WebSocket managers of one uvicorn worker"""
+
+    def __init__(self, broker=None):
+        self.backplane = Backplane(broker)
+        self.chat = ChatManager(self.backplane)
+        self.direct = DirectManager(self.backplane)
+        self.notifications = NotificationManager(self.backplane)
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+async def start_workers(count):
+    broker = InMemoryBroker()
+    workers = [Worker(broker) for _ in range(count)]
+    for worker in workers:
+        await worker.backplane.start()
+    return workers
+
+async def stop_workers(workers):
+    for worker in workers:
+        await worker.backplane.stop()
+    await settle()
+
+def test_chat_events_reach_the_worker_holding_the_receiver():
+    async def scenario():
+        first, second = await start_workers(2)
+        alice, bob = FakeSocket(), FakeSocket()
+        await first.chat.connect(alice, 1)
+        await second.chat.connect(bob, 2)
+        await settle()
+        # Presence goes to everyone else, on every worker
+        assert bob.sent == [{"type": "user_online", "data": {"user_id": 1}}]
+        assert alice.sent == [{"type": "user_online", "data": {"user_id": 2}}]
+        alice.sent.clear()
+        bob.sent.clear()
+
+        await first.chat.send_message_notification(1, 2, {"id": 7, "content": "hi"})
+        await first.chat.send_typing_status(1, 2, True)
+        await second.chat.send_read_up_to(2, 1, 7)
+        await settle()
+        assert bob.sent == [
+            {"type": "new_message", "data": {"id": 7, "content": "hi"}},
+            {"type": "typing_start", "data": {"user_id": 1}}
+        ]
+        assert alice.sent == [{"type": "messages_read_up_to", "data": {"up_to_id": 7, "reader_id": 2}}]
+
+        first.chat.disconnect(1)
+        await first.chat.broadcast_user_status(1, "user_offline")
+        await settle()
+        assert bob.sent[-1] == {"type": "user_offline", "data": {"user_id": 1}}
+        await stop_workers([first, second])
+
+    asyncio.run(scenario())
+
+def test_each_event_is_delivered_once():
+    async def scenario():
+        workers = await start_workers(3)
+        sockets = [FakeSocket() for _ in workers]
+        for user_id, (worker, socket) in enumerate(zip(workers, sockets), start=1):
+            await worker.direct.connect(socket, user_id)
+
+        await workers[0].direct.send_personal_message(json.dumps({"type": "chat", "from_user": 1}), 3)
+        await workers[1].direct.broadcast(json.dumps({"type": "notification"}))
+        await settle()
+        assert sockets[0].sent == [{"type": "notification"}]
+        assert sockets[1].sent == [{"type": "notification"}]
+        assert sockets[2].sent == [{"type": "chat", "from_user": 1}, {"type": "notification"}]
+        await stop_workers(workers)
+
+    asyncio.run(scenario())
+
+def test_notifications_reach_every_socket_of_the_user():
+    async def scenario():
+        first, second = await start_workers(2)
+        phone, laptop, other = FakeSocket(), FakeSocket(), FakeSocket()
+        await first.notifications.connect(phone, 5)
+        await second.notifications.connect(laptop, 5)
+        await second.notifications.connect(other, 6)
+
+        await first.notifications.send_notification(5, {"type": "follow", "user": "alice"})
+        await settle()
+        assert phone.sent == laptop.sent == [{"type": "follow", "user": "alice"}]
+        assert other.sent == []
+        await stop_workers([first, second])
+
+    asyncio.run(scenario())
+
+def test_delivers_in_process_until_started():
+    async def scenario():
+        worker = Worker()
+        alice, bob = FakeSocket(), FakeSocket()
+        await worker.chat.connect(alice, 1)
+        await worker.chat.connect(bob, 2)
+        await worker.chat.send_message_notification(2, 1, {"id": 1})
+        assert alice.sent[-1] == {"type": "new_message", "data": {"id": 1}}
+
+    asyncio.run(scenario())
@@ -17,7 +17,8 @@ export const useWebSocket = (userId: number | undefined) => {
     if (!userId) return;
 
     const connect = () => {
-      ws.current = new WebSocket(`${getWebSocketURL()}/ws/${userId}`);
+      const token = localStorage.getItem('token');
+      ws.current = new WebSocket(`${getWebSocketURL()}/ws/${userId}?token=${token}`);
       
       ws.current.onopen = () => {
         setIsConnected(true);